@@ -196,140 +196,142 @@ async def run_conversation_turn(
             if layout.is_interrupted():
                 layout.clear_interrupted()
                 layout.set_status("Interrupted")
-            await asyncio.sleep(0.5)
-            layout.clear_status()
-            break
-
-        # Update status (spinner will animate automatically)
-        layout.set_status("Thinking...")
-
-        # Start streaming
-        ui.stream_start()
-
-        response = await client.chat_stream(
-            messages=conversation.get_messages(),
-            tools=tools,
-            on_content=ui.stream_chunk,
-        )
-
-        # Check for interruption after response
-        if layout.is_interrupted():
-            layout.clear_interrupted()
-            ui.stream_end()
-            layout.set_status("Interrupted")
-            await asyncio.sleep(0.5)
-            layout.clear_status()
-            break
+                await asyncio.sleep(0.5)
+                layout.clear_status()
+                break
 
-        # End streaming and display
-        ui.stream_end()
-        layout.clear_status()
+            # Update status (spinner will animate automatically)
+            layout.set_status("Thinking...")
 
-        # Add assistant message to conversation
-        conversation.add_assistant_message(content=response.content, tool_calls=response.tool_calls)
+            # Start streaming
+            ui.stream_start()
 
-        # If no tool calls, we're done
-        if not response.tool_calls:
-            break
+            response = await client.chat_stream(
+                messages=conversation.get_messages(),
+                tools=tools,
+                on_content=ui.stream_chunk,
+            )
 
-        # Execute tool calls
-        for tool_call in response.tool_calls:
-            # Check for interruption
+            # Check for interruption after response
             if layout.is_interrupted():
                 layout.clear_interrupted()
+                ui.stream_end()
                 layout.set_status("Interrupted")
                 await asyncio.sleep(0.5)
                 layout.clear_status()
-                layout.set_busy(False)
-                return
-
-            # Update status spinner
-            tool_label = ui._format_tool(tool_call.name, tool_call.arguments)
-            layout.set_status(tool_label)
+                break
 
-            # Check permissions
-            from .permissions import PermissionManager, format_tool_for_approval
+            # End streaming and display
+            ui.stream_end()
+            layout.clear_status()
 
-            perm_mgr = PermissionManager.get_instance()
-            allowed, danger_reason, approval_key = perm_mgr.check_permission(
-                tool_call.name, tool_call.arguments
+            # Add assistant message to conversation
+            conversation.add_assistant_message(
+                content=response.content, tool_calls=response.tool_calls
             )
 
-            if not allowed:
-                # Need approval - prompt user
-                tool_desc = format_tool_for_approval(tool_call.name, tool_call.arguments)
-                response_choice = await layout.prompt_approval(tool_desc, danger_reason)
-
-                if response_choice == "no":
-                    result = "Tool execution denied by user"
-                    conversation.add_tool_result(tool_call.id, tool_call.name, result)
-                    continue
-                elif response_choice == "always":
-                    # Save persistent approval
-                    perm_mgr.approve(tool_call.name, approval_key, persistent=True)
-                else:  # yes
-                    # Session-only approval
-                    perm_mgr.approve(tool_call.name, approval_key, persistent=False)
-
-            # Execute tool
-            result = await registry.execute(tool_call.name, tool_call.arguments)
-
-            # Calculate line changes for file operations
-            lines_added = 0
-            lines_removed = 0
-
-            if tool_call.name == "edit_file" and "Successfully" in result:
-                filepath = tool_call.arguments.get("file_path", "")
-                old_str = tool_call.arguments.get("old_string", "")
-                new_str = tool_call.arguments.get("new_string", "")
-
-                file_changes["files"].add(filepath)
-                lines_removed = old_str.count("\n") + 1
-                lines_added = new_str.count("\n") + 1
-                file_changes["removed"] += lines_removed
-                file_changes["added"] += lines_added
-
-                # Show diff for edits
-                layout.add_file_diff(filepath, old_str, new_str)
-
-                layout.set_file_changes(
-                    len(file_changes["files"]),
-                    file_changes["added"],
-                    file_changes["removed"],
+            # If no tool calls, we're done
+            if not response.tool_calls:
+                break
+
+            # Execute tool calls
+            for tool_call in response.tool_calls:
+                # Check for interruption
+                if layout.is_interrupted():
+                    layout.clear_interrupted()
+                    layout.set_status("Interrupted")
+                    await asyncio.sleep(0.5)
+                    layout.clear_status()
+                    layout.set_busy(False)
+                    return
+
+                # Update status spinner
+                tool_label = ui._format_tool(tool_call.name, tool_call.arguments)
+                layout.set_status(tool_label)
+
+                # Check permissions
+                from .permissions import PermissionManager, format_tool_for_approval
+
+                perm_mgr = PermissionManager.get_instance()
+                allowed, danger_reason, approval_key = perm_mgr.check_permission(
+                    tool_call.name, tool_call.arguments
                 )
 
-            elif tool_call.name == "write_file" and "Successfully" in result:
-                filepath = tool_call.arguments.get("file_path", "")
-                content = tool_call.arguments.get("content", "")
+                if not allowed:
+                    # Need approval - prompt user
+                    tool_desc = format_tool_for_approval(tool_call.name, tool_call.arguments)
+                    response_choice = await layout.prompt_approval(tool_desc, danger_reason)
 
-                file_changes["files"].add(filepath)
-                lines_added = content.count("\n") + 1
-                file_changes["added"] += lines_added
+                    if response_choice == "no":
+                        result = "Tool execution denied by user"
+                        conversation.add_tool_result(tool_call.id, tool_call.name, result)
+                        continue
+                    elif response_choice == "always":
+                        # Save persistent approval
+                        perm_mgr.approve(tool_call.name, approval_key, persistent=True)
+                    else:  # yes
+                        # Session-only approval
+                        perm_mgr.approve(tool_call.name, approval_key, persistent=False)
+
+                # Execute tool
+                result = await registry.execute(tool_call.name, tool_call.arguments)
+
+                # Calculate line changes for file operations
+                lines_added = 0
+                lines_removed = 0
+
+                if tool_call.name == "edit_file" and "Successfully" in result:
+                    filepath = tool_call.arguments.get("file_path", "")
+                    old_str = tool_call.arguments.get("old_string", "")
+                    new_str = tool_call.arguments.get("new_string", "")
+
+                    file_changes["files"].add(filepath)
+                    lines_removed = old_str.count("\n") + 1
+                    lines_added = new_str.count("\n") + 1
+                    file_changes["removed"] += lines_removed
+                    file_changes["added"] += lines_added
+
+                    # Show diff for edits
+                    layout.add_file_diff(filepath, old_str, new_str)
+
+                    layout.set_file_changes(
+                        len(file_changes["files"]),
+                        file_changes["added"],
+                        file_changes["removed"],
+                    )
 
-                # Show diff for new file (empty old content)
-                layout.add_file_diff(filepath, "", content)
+                elif tool_call.name == "write_file" and "Successfully" in result:
+                    filepath = tool_call.arguments.get("file_path", "")
+                    content = tool_call.arguments.get("content", "")
 
-                layout.set_file_changes(
-                    len(file_changes["files"]),
-                    file_changes["added"],
-                    file_changes["removed"],
-                )
+                    file_changes["files"].add(filepath)
+                    lines_added = content.count("\n") + 1
+                    file_changes["added"] += lines_added
 
-            elif tool_call.name == "read_file":
-                filepath = tool_call.arguments.get("file_path", "")
-                short_path = filepath.split("/")[-1] if "/" in filepath else filepath
-                line_count = result.count("\n") if result else 0
-                layout.add_tool_call(tool_call.name, short_path, f"{line_count} lines")
+                    # Show diff for new file (empty old content)
+                    layout.add_file_diff(filepath, "", content)
 
-            else:
-                # Other tools - show with result summary
-                layout.add_tool_call(tool_call.name, tool_label, result)
+                    layout.set_file_changes(
+                        len(file_changes["files"]),
+                        file_changes["added"],
+                        file_changes["removed"],
+                    )
 
-            conversation.add_tool_result(
-                tool_call_id=tool_call.id,
-                name=tool_call.name,
-                result=result,
-            )
+                elif tool_call.name == "read_file":
+                    filepath = tool_call.arguments.get("file_path", "")
+                    short_path = filepath.split("/")[-1] if "/" in filepath else filepath
+                    line_count = result.count("\n") if result else 0
+                    layout.add_tool_call(tool_call.name, short_path, f"{line_count} lines")
+
+                else:
+                    # Other tools - show with result summary
+                    layout.add_tool_call(tool_call.name, tool_label, result)
+
+                conversation.add_tool_result(
+                    tool_call_id=tool_call.id,
+                    name=tool_call.name,
+                    result=result,
+                )
 
     except Exception as e:
         # Log error to output and re-raise
@@ -518,58 +520,56 @@ You are a thorough code reviewer. When reviewing code:
 """
                 example_agent.write_text(example_agent_content)
 
-                layout.append_output("")
-                layout.append_output("@@TOOL@@ Write(.grok/GROK.md)")
-                layout.append_output("  @@RESULT@@ Created project configuration")
-                layout.append_output("@@TOOL@@ Write(.grok/agents/code-reviewer.md)")
-                layout.append_output("  @@RESULT@@ Created example agent")
-                layout.append_output("")
-                layout.append_output("Initialized `.grok/` folder with:")
-                layout.append_output("  - `GROK.md` - Project instructions")
-                layout.append_output("  - `agents/code-reviewer.md` - Example custom agent")
-                layout.append_output("  - `plans/` - Planning documents")
-                layout.append_output("  - `handoffs/` - Session handoff files")
-                layout.append_output("")
-                layout.append_output("Edit `.grok/GROK.md` to customize how Grok responds.")
-                layout.append_output("Use `@agent:code-reviewer` to invoke the example agent.")
-                layout.append_output("")
+                layout.append_output_many(
+                    [
+                        "",
+                        "@@TOOL@@ Write(.grok/GROK.md)",
+                        "  @@RESULT@@ Created project configuration",
+                        "@@TOOL@@ Write(.grok/agents/code-reviewer.md)",
+                        "  @@RESULT@@ Created example agent",
+                        "",
+                        "Initialized `.grok/` folder with:",
+                        "  - `GROK.md` - Project instructions",
+                        "  - `agents/code-reviewer.md` - Example custom agent",
+                        "  - `plans/` - Planning documents",
+                        "  - `handoffs/` - Session handoff files",
+                        "",
+                        "Edit `.grok/GROK.md` to customize how Grok responds.",
+                        "Use `@agent:code-reviewer` to invoke the example agent.",
+                        "",
+                    ]
+                )
 
                 # Reload plugins to pick up new folder
                 plugin_registry.reload()
                 continue
 
             if cmd in ("help", "?"):
-                layout.append_output("")
-                layout.append_output("# grokCode")
-                layout.append_output("AI coding assistant powered by Grok")
-                layout.append_output("")
-                layout.append_output("## Usage")
-                layout.append_output("Type naturally to chat, or use commands below.")
-                layout.append_output("`@file` to mention files \u00b7 `!cmd` to run bash")
-                layout.append_output("")
-                layout.append_output("## Commands")
-                layout.append_output("  `/init`       Initialize project    `/help`       Help")
-                layout.append_output(
-                    "  `/agents`     Manage agents         `/agents new` Create agent"
-                )
-                layout.append_output(
-                    "  `/save`       Save history          `/load`       Load history"
-                )
-                layout.append_output(
-                    "  `/plugins`    Plugins               `/tools`      List tools"
-                )
-                layout.append_output(
-                    "  `/tasks`      Tasks                 `/plan`       Plan mode"
-                )
-                layout.append_output("  `/clear`      Clear                 `/config`     Config")
-                layout.append_output("  `/exit`       Exit")
-                layout.append_output("")
-                layout.append_output("## Shortcuts")
-                layout.append_output(
-                    "  `Ctrl+C` Cancel \u00b7 `Ctrl+C Ctrl+C` Exit \u00b7 `Ctrl+D` Exit"
+                layout.append_output_many(
+                    [
+                        "",
+                        "# grokCode",
+                        "AI coding assistant powered by Grok",
+                        "",
+                        "## Usage",
+                        "Type naturally to chat, or use commands below.",
+                        "`@file` to mention files \u00b7 `!cmd` to run bash",
+                        "",
+                        "## Commands",
+                        "  `/init`       Initialize project    `/help`       Help",
+                        "  `/agents`     Manage agents         `/agents new` Create agent",
+                        "  `/save`       Save history          `/load`       Load history",
+                        "  `/plugins`    Plugins               `/tools`      List tools",
+                        "  `/tasks`      Tasks                 `/plan`       Plan mode",
+                        "  `/clear`      Clear                 `/config`     Config",
+                        "  `/exit`       Exit",
+                        "",
+                        "## Shortcuts",
+                        "  `Ctrl+C` Cancel \u00b7 `Ctrl+C Ctrl+C` Exit \u00b7 `Ctrl+D` Exit",
+                        "  `PageUp/Down` Scroll \u00b7 `Shift+Tab` Cycle mode",
+                        "",
+                    ]
                 )
-                layout.append_output("  `PageUp/Down` Scroll \u00b7 `Shift+Tab` Cycle mode")
-                layout.append_output("")
                 continue
 
             if cmd == "tasks":
@@ -577,19 +577,20 @@ You are a thorough code reviewer. When reviewing code:
 
                 store = TaskStore.get_instance()
                 tasks = store.list_all()
-                layout.append_output("")
-                layout.append_output("## Tasks")
-                if not tasks:
-                    layout.append_output("  No active tasks")
-                else:
-                    for task in tasks:
-                        status_icon = {
-                            "pending": "\u25cb",
-                            "in_progress": "\u25d0",
-                            "completed": "\u25cf",
-                        }.get(task.status.value, "?")
-                        layout.append_output(f"  {status_icon} #{task.id} {task.subject}")
-                layout.append_output("")
+                with layout.batch_updates():
+                    layout.append_output("")
+                    layout.append_output("## Tasks")
+                    if not tasks:
+                        layout.append_output("  No active tasks")
+                    else:
+                        for task in tasks:
+                            status_icon = {
+                                "pending": "\u25cb",
+                                "in_progress": "\u25d0",
+                                "completed": "\u25cf",
+                            }.get(task.status.value, "?")
+                            layout.append_output(f"  {status_icon} #{task.id} {task.subject}")
+                    layout.append_output("")
                 continue
 
             if cmd == "agents" or cmd.startswith("agents "):
@@ -1249,10 +1250,15 @@ async def main_async() -> int:
     except Exception as e:
         print(f"Fatal error: {e}")
         return 1
+    finally:
+        from .tools.web import close_client
+
+        await close_client()
 
 
 def main() -> int:
     """Main entry point"""
+    ChatLayout.use_uvloop()
     try:
         return asyncio.run(main_async())
     except KeyboardInterrupt:
@@ -3,6 +3,7 @@
 import json
 import re
 from dataclasses import dataclass, field
+from functools import cached_property
 from pathlib import Path
 from typing import Optional
 
@@ -20,6 +21,11 @@ class Agent:
     plugin: str = ""
     file_path: str = ""
 
+    @cached_property
+    def name_lower(self) -> str:
+        """Lowercased name for case-insensitive matching"""
+        return self.name.lower()
+
     @property
     def full_name(self) -> str:
         """Full name including plugin prefix"""
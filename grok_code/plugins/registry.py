@@ -18,6 +18,8 @@ class PluginRegistry:
         self._commands: dict[str, Command] = {}
         self._skills: dict[str, Skill] = {}
         self._hooks: dict[str, list[Hook]] = {}
+        # Bumped whenever the registered components change
+        self._version = 0
 
     @classmethod
     def get_instance(cls) -> "PluginRegistry":
@@ -39,6 +41,7 @@ class PluginRegistry:
     def _register_plugin(self, plugin: Plugin) -> None:
         """Register a plugin and all its components"""
         self._plugins[plugin.name] = plugin
+        self._version += 1
 
         # Register agents
         for agent in plugin.agents:
@@ -129,6 +132,7 @@ class PluginRegistry:
         self._commands.clear()
         self._skills.clear()
         self._hooks.clear()
+        self._version += 1
         self.load_plugins()
 
 
@@ -9,10 +9,12 @@ class ToolRegistry:
 
     def __init__(self):
         self._tools: dict[str, Tool] = {}
+        self._schema_cache: list[dict] | None = None
 
     def register(self, tool: Tool) -> None:
         """Register a tool"""
         self._tools[tool.name] = tool
+        self._schema_cache = None
 
     def get(self, name: str) -> Tool | None:
         """Get a tool by name"""
@@ -23,8 +25,10 @@ class ToolRegistry:
         return list(self._tools.values())
 
     def get_schemas(self) -> list[dict]:
-        """Get OpenAI-compatible schemas for all tools"""
-        return [tool.to_openai_schema() for tool in self._tools.values()]
+        """Get OpenAI-compatible schemas for all tools (built once per registration)"""
+        if self._schema_cache is None:
+            self._schema_cache = [tool.to_openai_schema() for tool in self._tools.values()]
+        return list(self._schema_cache)
 
     async def execute(self, name: str, arguments: dict) -> str:
         """Execute a tool by name with arguments"""
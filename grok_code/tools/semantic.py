@@ -9,9 +9,21 @@ from dataclasses import dataclass
 import networkx as nx
 from sentence_transformers import SentenceTransformer
 import ast  # Python import graph
+
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 from .base import Tool
 from .file_ops import glob
 
+# Classes larger than this (bytes) are indexed per method instead of whole
+CLASS_CHUNK_LIMIT = 2048
+
+
 @dataclass
 class Chunk:
     path: str
@@ -32,7 +44,7 @@ class SemanticIndex:
         self._path_to_idx: Dict[str, int] = {}
 
     def build(self) -> Tuple[int, int]:
-        \"\"\"Build embeddings + graph. Returns (chunks, nodes/edges)\"\"\"
+        """Build embeddings + graph. Returns (chunks, nodes/edges)"""
         self._chunks = []
         py_files = glob("**/*.py", path=str(self.root))
         for file_path in py_files[:100]:  # Limit
@@ -49,25 +61,52 @@ class SemanticIndex:
         return len(self._chunks), nodes + edges
 
     def _chunk_file(self, path: Path) -> List:
-        \"\"\"Chunk into funcs/classes (AST).\"\"\"
+        """Chunk into top-level funcs/classes (AST); big classes split into methods."""
         chunks = []
         try:
             content = path.read_text()
             tree = ast.parse(content)
-            for node in ast.walk(tree):
-                if isinstance(node, (ast.FunctionDef, ast.ClassDef, ast.AsyncFunctionDef)):
-                    start = node.lineno
-                    end = node.end_lineno or start
-                    lines = content.splitlines()
-                    text = '\\n'.join(lines[start-1:end])
+            lines = content.splitlines()
+
+            def add_span(start, end):
+                text = '\n'.join(lines[start-1:end])
+                if text.strip():
                     chunks.append(type('Chunk', (), {'start': start, 'end': end, 'text': text})())
+
+            def add(node):
+                add_span(node.lineno, node.end_lineno or node.lineno)
+
+            for node in ast.iter_child_nodes(tree):
+                if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                    add(node)
+                elif isinstance(node, ast.ClassDef):
+                    start, end = node.lineno, node.end_lineno or node.lineno
+                    methods = [
+                        child for child in node.body
+                        if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef))
+                    ]
+                    if not methods or len('\n'.join(lines[start-1:end])) <= CLASS_CHUNK_LIMIT:
+                        add(node)
+                        continue
+                    # One chunk per method (with its decorators), plus the rest of the
+                    # class - header, docstring, attributes, nested classes - between them
+                    gap_start = start
+                    for method in methods:
+                        method_start = min(
+                            [method.lineno] + [d.lineno for d in method.decorator_list]
+                        )
+                        add_span(gap_start, method_start - 1)
+                        method_end = method.end_lineno or method.lineno
+                        add_span(method_start, method_end)
+                        gap_start = method_end + 1
+                    add_span(gap_start, end)
         except:
             # Fallback whole file
             chunks.append(type('Chunk', (), {'start': 1, 'end': 999, 'text': path.read_text()})())
         return chunks
 
     def _build_graph(self):
-        \"\"\"Import dep graph (AST).\"\"\"
+        """Import dep graph (AST)."""
         self._graph = nx.DiGraph()
         for chunk in self._chunks:
             path = self.root / chunk.path
@@ -86,17 +125,25 @@ class SemanticIndex:
                 f.write(json.dumps({
                     'path': chunk.path, 'start': chunk.start, 'end': chunk.end,
                     'text': chunk.text, 'embedding': chunk.embedding
-                }) + '\\n')
+                }) + '\n')
         nx.write_gpickle(self._graph, self._graph_file)
 
     def _load(self):
         self._chunks = []
         if self.chunks_file.exists():
-            with open(self.chunks_file) as f:
-                for line in f:
-                    data = json.loads(line)
-                    self._chunks.append(Chunk(**data))
-            self._embeddings = np.array([c.embedding for c in self._chunks])
+            loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+            with open(self.chunks_file, 'rb') as f:
+                lines = [line for line in f if line.strip()]
+            embeddings = None
+            for i, line in enumerate(lines):
+                data = loads(line)
+                if embeddings is None:
+                    embeddings = np.empty((len(lines), len(data['embedding'])), dtype=np.float32)
+                embeddings[i] = data['embedding']
+                self._chunks.append(Chunk(
+                    data['path'], data['start'], data['end'], data['text'], embeddings[i]
+                ))
+            self._embeddings = embeddings if embeddings is not None else np.array([])
         if self.graph_file.exists():
             self._graph = nx.read_gpickle(self._graph_file)
 
@@ -111,9 +158,9 @@ class SemanticIndex:
         for i in top_idx:
             chunk = self._chunks[i]
             score = sims[i]
-            results.append(f"**{chunk.path}:{chunk.start}-{chunk.end}** ({score:.2f})\\n{chunk.text[:200]}...")
+            results.append(f"**{chunk.path}:{chunk.start}-{chunk.end}** ({score:.2f})\n{chunk.text[:200]}...")
             # Graph hops: files connected
             if hops > 0 and chunk.path in self._path_to_idx:
                 neighbors = nx.ego_graph(self._graph, chunk.path, radius=hops).nodes
                 results.append(f"Related: {', '.join(neighbors[:3])}")
-        return '\\n\\n'.join(results)
\ No newline at end of file
+        return '\n\n'.join(results)
\ No newline at end of file
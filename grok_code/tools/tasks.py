@@ -14,6 +14,13 @@ class TaskStatus(Enum):
     DELETED = "deleted"
 
 
+STATUS_ICON = {
+    TaskStatus.PENDING: "○",
+    TaskStatus.IN_PROGRESS: "◐",
+    TaskStatus.COMPLETED: "●",
+}
+
+
 @dataclass
 class TaskItem:
     """A task/todo item"""
@@ -30,11 +37,17 @@ class TaskItem:
 
 
 class TaskStore:
-    """Global task storage"""
+    """Global task storage
+
+    Deleted tasks are dropped from ``_tasks`` immediately, so the dict only
+    ever holds live tasks and listing never has to filter. ``_version`` is
+    bumped on every change so views can cache what they render from it.
+    """
 
     _instance: ClassVar["TaskStore | None"] = None
     _tasks: ClassVar[dict[str, TaskItem]] = {}
     _counter: ClassVar[int] = 0
+    _version: ClassVar[int] = 0
 
     @classmethod
     def get_instance(cls) -> "TaskStore":
@@ -52,6 +65,7 @@ class TaskStore:
             active_form=active_form or f"Working on: {subject}",
         )
         TaskStore._tasks[task_id] = task
+        TaskStore._version += 1
         return task
 
     def get(self, task_id: str) -> TaskItem | None:
@@ -61,15 +75,16 @@ class TaskStore:
         task = TaskStore._tasks.get(task_id)
         if not task:
             return None
+        TaskStore._version += 1
 
         if "status" in kwargs:
             status = kwargs["status"]
             if isinstance(status, str):
-                if status == "deleted":
-                    del TaskStore._tasks[task_id]
-                    return task
                 status = TaskStatus(status)
             task.status = status
+            if status == TaskStatus.DELETED:
+                del TaskStore._tasks[task_id]
+                return task
 
         if "subject" in kwargs:
             task.subject = kwargs["subject"]
@@ -89,11 +104,12 @@ class TaskStore:
         return task
 
     def list_all(self) -> list[TaskItem]:
-        return [t for t in TaskStore._tasks.values() if t.status != TaskStatus.DELETED]
+        return list(TaskStore._tasks.values())
 
     def clear(self):
         TaskStore._tasks.clear()
         TaskStore._counter = 0
+        TaskStore._version += 1
 
 
 class TaskCreateTool(Tool):
@@ -213,18 +229,11 @@ class TaskListTool(Tool):
         if not tasks:
             return "No tasks found"
 
-        lines = []
-        for task in tasks:
-            status_icon = {
-                TaskStatus.PENDING: "○",
-                TaskStatus.IN_PROGRESS: "◐",
-                TaskStatus.COMPLETED: "●",
-            }.get(task.status, "?")
-
-            blocked = f" (blocked by: {', '.join(task.blocked_by)})" if task.blocked_by else ""
-            lines.append(f"#{task.id} {status_icon} [{task.status.value}] {task.subject}{blocked}")
-
-        return "\n".join(lines)
+        return "\n".join(
+            f"#{task.id} {STATUS_ICON.get(task.status, '?')} [{task.status.value}] {task.subject}"
+            + (f" (blocked by: {', '.join(task.blocked_by)})" if task.blocked_by else "")
+            for task in tasks
+        )
 
 
 class TaskGetTool(Tool):
@@ -2,18 +2,43 @@
 
 from pathlib import Path
 from typing import Dict, List
-import subprocess
+import asyncio
 import re
 from .base import Tool
 from .file_ops import mark_file_read  # Reuse if needed
 
+_SUMMARY_RE = re.compile(r'(\d+) passed(?:, (\d+) failed)?(?:, (\d+) skipped)?')
+_SUMMARY_TAIL = 4096  # pytest prints its summary line last
+
+_LANG_CACHE: Dict[str, str] = {}
+
+
+def _has_match(root: Path, pattern: str) -> bool:
+    return next(root.glob(pattern), None) is not None
+
+
 def detect_lang(scope: str) -> str:
-    \"\"\"Detect language from scope/dir.\"\"\"
-    if 'test' in scope or Path(scope).glob('test_*.py'):
+    """Detect language from scope/dir."""
+    if scope.endswith('.py'):
         return 'py'
-    if Path(scope).glob('*.js') or Path(scope).glob('*.ts'):
+    if scope.endswith(('.js', '.ts')):
         return 'js'
-    return 'unknown'
+    root = Path(scope)
+    # Directories named like tests/ are assumed to hold Python tests
+    if 'test' in scope and not root.suffix:
+        return 'py'
+    cached = _LANG_CACHE.get(scope)
+    if cached is not None:
+        return cached
+    if _has_match(root, 'test_*.py'):
+        lang = 'py'
+    elif _has_match(root, '*.js') or _has_match(root, '*.ts'):
+        lang = 'js'
+    else:
+        # Not cached: tests may be added to this directory later
+        return 'unknown'
+    _LANG_CACHE[scope] = lang
+    return lang
 
 def get_test_cmd(lang: str, scope: str) -> List[str]:
     if lang == 'py':
@@ -21,12 +46,15 @@ def get_test_cmd(lang: str, scope: str) -> List[str]:
     elif lang == 'js':
         return ['npm', 'test', '--', scope] if Path('package.json').exists() else ['jest', scope]
     elif lang == 'lint':
-        return ['ruff', 'check', scope] if Path('.').glob('pyproject.toml') else ['eslint', scope]
+        return ['ruff', 'check', scope] if Path('pyproject.toml').exists() else ['eslint', scope]
     return []
 
 def parse_summary(output: str) -> str:
-    \"\"\"Parse test/lint summary.\"\"\"
-    py_match = re.search(r'(\\d+) passed(?:, (\\d+) failed)?(?:, (\\d+) skipped)?', output)
+    """Parse test/lint summary."""
+    tail_start = max(0, len(output) - _SUMMARY_TAIL)
+    # Start at a line boundary so a count is never cut in half
+    tail_start = output.rfind("\n", 0, tail_start) + 1
+    py_match = _SUMMARY_RE.search(output, tail_start) or _SUMMARY_RE.search(output, 0, tail_start)
     if py_match:
         passed, failed, skipped = py_match.groups()
         failed = failed or 0
@@ -41,14 +69,14 @@ class TestRunTool(Tool):
 
     @property
     def description(self) -> str:
-        return \"\"\"Run tests or lint in scope (auto-detect py/js/lint).
+        return """Run tests or lint in scope (auto-detect py/js/lint).
 
 Params:
 - scope: dir/pattern e.g. 'tests/', 'src/**/*.py'
 - lang: 'py'/'js'/'lint'/'auto' (default)
 
 Returns summary + failures.
-        \"\"\"
+        """
 
     @property
     def parameters(self) -> dict:
@@ -67,12 +95,23 @@ Returns summary + failures.
         if not cmd:
             return f"No test runner for {lang} in {scope}"
         try:
-            res = subprocess.run(cmd, capture_output=True, text=True, timeout=120, cwd=Path.cwd())
-            summary = parse_summary(res.stdout)
-            failures = res.stderr or res.stdout if res.returncode else ""
+            proc = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                cwd=Path.cwd(),
+            )
+            try:
+                stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=120)
+            except asyncio.TimeoutError:
+                proc.kill()
+                await proc.wait()
+                return "Test timeout (120s)"
+            out = stdout.decode("utf-8", errors="replace")
+            err = stderr.decode("utf-8", errors="replace")
+            summary = parse_summary(out)
+            failures = err or out if proc.returncode else ""
             mark_file_read(scope)  # Treat as 'read'
-            return f"Test {lang} {scope}: {summary}\\n\\n{failures[:2000]}{'...' if len(failures)>2000 else ''}"
-        except subprocess.TimeoutExpired:
-            return "Test timeout (120s)"
+            return f"Test {lang} {scope}: {summary}\n\n{failures[:2000]}{'...' if len(failures)>2000 else ''}"
         except Exception as e:
             return f"Test error: {e}"
\ No newline at end of file
@@ -1,21 +1,81 @@
 """Multi-lang editing with tree-sitter AST."""
 
-from tree_sitter import Language, Parser, Node
-from tree_sitter_languages import get_language, get_parser  # pip tree-sitter-languages
+from tree_sitter import Language, Parser, Node, Tree
+from tree_sitter_languages import get_language  # pip tree-sitter-languages
+from collections import OrderedDict
+from functools import lru_cache
 from pathlib import Path
 from .base import Tool
 from .file_ops import has_file_been_read
 
+# Tool lang name -> tree-sitter-languages grammar name
 LANGUAGES = {
-    'py': get_language('python'),
-    'js': get_language('javascript'),
-    'ts': get_language('typescript'), 
-    'cpp': get_language('cpp'),
-    'c_sharp': get_language('csharp'),
-    'rust': get_language('rust'),
+    'py': 'python',
+    'js': 'javascript',
+    'ts': 'typescript',
+    'cpp': 'cpp',
+    'c_sharp': 'csharp',
+    'rust': 'rust',
     # Add more
 }
 
+
+@lru_cache(maxsize=None)
+def _get_lang(lang: str) -> Language:
+    """Load a grammar on first use instead of at import time."""
+    return get_language(LANGUAGES[lang])
+
+
+_PARSERS: dict[str, Parser] = {}
+_QUERIES: dict[tuple[str, str], object] = {}
+# Last parse of the most recently edited files, so follow-up edits can reparse
+# incrementally; bounded since each entry holds the file bytes and its tree
+_TREES: OrderedDict[str, tuple[bytes, Tree]] = OrderedDict()
+_TREES_MAX = 4
+
+
+def get_parser(lang: str) -> Parser:
+    """Return a cached parser for lang (parsers are reusable across calls)."""
+    parser = _PARSERS.get(lang)
+    if parser is None:
+        parser = Parser()
+        parser.set_language(_get_lang(lang))
+        _PARSERS[lang] = parser
+    return parser
+
+
+def get_query(lang: str, query_str: str):
+    """Return a cached compiled query for (lang, query_str)."""
+    key = (lang, query_str)
+    query = _QUERIES.get(key)
+    if query is None:
+        query = _get_lang(lang).query(query_str)
+        _QUERIES[key] = query
+    return query
+
+
+def _point_at(data: bytes, pos: int) -> tuple[int, int]:
+    """(row, column) of byte offset pos, as tree-sitter expects."""
+    row = data.count(b'\n', 0, pos)
+    return row, pos - (data.rfind(b'\n', 0, pos) + 1)
+
+
+def _reparse_after_insert(
+    parser: Parser, tree: Tree, old: bytes, new: bytes, pos: int, length: int
+) -> Tree:
+    """Apply an insertion of length bytes at pos to tree and reparse incrementally."""
+    start_point = _point_at(old, pos)
+    tree.edit(
+        start_byte=pos,
+        old_end_byte=pos,
+        new_end_byte=pos + length,
+        start_point=start_point,
+        old_end_point=start_point,
+        new_end_point=_point_at(new, pos + length),
+    )
+    return parser.parse(new, tree)
+
+
 def detect_lang(path: Path) -> str:
     suffix = path.suffix[1:]
     mapping = {'py': 'py', 'js': 'js', 'ts': 'ts', 'cpp': 'cpp', 'cs': 'c_sharp', 'rs': 'rust'}
@@ -23,12 +83,12 @@ def detect_lang(path: Path) -> str:
 
 class TreeEditTool(Tool):
     name = "tree_edit"
-    description = \"\"\"Multi-lang AST edit with tree-sitter (py/js/ts/cpp/c#/rust).
+    description = """Multi-lang AST edit with tree-sitter (py/js/ts/cpp/c#/rust).
 
 Instructions: 'insert func after import', 'replace class Foo body with ...'.
 Query-based node ops.
 Requires read_file first.
-    \"\"\"
+    """
 
     @property
     def parameters(self) -> dict:
@@ -51,36 +111,37 @@ Requires read_file first.
         lang = suffix_lang if lang == "auto" else lang
         if lang not in LANGUAGES:
             return f"Unsupported lang: {lang}"
-        LANGUAGE = LANGUAGES[lang]
-        parser = Parser()
-        parser.set_language(LANGUAGE)
-        tree = parser.parse(content_bytes)
+        parser = get_parser(lang)
+        cache_key = f"{lang}:{path.resolve()}"
+        cached = _TREES.get(cache_key)
+        if cached and cached[0] == content_bytes:
+            tree = cached[1]
+        else:
+            if cached:
+                # File changed since our last edit; the old tree is no use
+                del _TREES[cache_key]
+            tree = parser.parse(content_bytes)
         root = tree.root_node
 
         # Simple ops from instructions
         if 'insert' in instructions:
             # Find target node, insert sibling text
             target_query = "(function_definition name: (_) @target)"  # Extend
-            query = LANGUAGE.query(target_query)
+            query = get_query(lang, target_query)
             matches = query.captures(root)
             if matches:
                 target_node = matches[0][0]
-                insert_text = parse_insert_text(instructions)
-                # Serialize insert as node
-                new_bytes = insert_text.encode()
-                new_tree = parser.parse(new_bytes)
-                insert_node = new_tree.root_node.children[0]
-                # Parent replace children slice
-                parent = target_node.parent
-                idx = list(parent.children).index(target_node)
-                new_children = parent.children[:idx+1] + (insert_node,) + parent.children[idx+1:]
-                new_root = parent.replace(new_children)
-                new_content = new_root.sexp()  # Serialize? Use byte slice edit
-                # Simple: string insert at end_node.end_byte
+                new_bytes = parse_insert_text(instructions).encode()
+                # Insert as a sibling by splicing bytes right after the target node
                 insert_pos = target_node.end_byte
                 new_content = content_bytes[:insert_pos] + new_bytes + content_bytes[insert_pos:]
             else:
-                new_content = content_bytes + b'\n' + parse_insert_text(instructions).encode()
+                insert_pos = len(content_bytes)
+                new_bytes = b'\n' + parse_insert_text(instructions).encode()
+                new_content = content_bytes + new_bytes
+            tree = _reparse_after_insert(
+                parser, tree, content_bytes, new_content, insert_pos, len(new_bytes)
+            )
         elif 'replace' in instructions:
             # Query replace node text
             pass  # Similar
@@ -88,6 +149,10 @@ Requires read_file first.
             return "Unsupported instr."
 
         path.write_bytes(new_content)
+        _TREES[cache_key] = (new_content, tree)
+        _TREES.move_to_end(cache_key)
+        if len(_TREES) > _TREES_MAX:
+            _TREES.popitem(last=False)
         return f"Tree-edit {lang} {path}: applied {instructions}"
 
 def parse_insert_text(instr: str) -> str:
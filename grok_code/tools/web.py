@@ -1,18 +1,93 @@
 """Web tools: WebFetch and WebSearch"""
 
+import asyncio
+import html as _html
+import importlib.util
 import re
-from urllib.parse import urlparse
+import time
+from collections import OrderedDict
+from urllib.parse import unquote, urlparse
 
 import httpx
 
+try:
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    SELECTOLAX_AVAILABLE = False
+
+# google-re2 scans result pages in linear time when installed
+try:
+    import re2 as _ddg_re
+except ImportError:
+    _ddg_re = re
+
 from .base import Tool
 
+_RE_SCRIPT = re.compile(r"<script[^>]*>.*?</script>", re.DOTALL | re.IGNORECASE)
+_RE_STYLE = re.compile(r"<style[^>]*>.*?</style>", re.DOTALL | re.IGNORECASE)
+_RE_BR = re.compile(r"<br\s*/?>", re.IGNORECASE)
+_RE_P = re.compile(r"</?p[^>]*>", re.IGNORECASE)
+_RE_DIV = re.compile(r"</?div[^>]*>", re.IGNORECASE)
+_RE_LI = re.compile(r"<li[^>]*>", re.IGNORECASE)
+_RE_H_OPEN = re.compile(r"<h[1-6][^>]*>", re.IGNORECASE)
+_RE_H_CLOSE = re.compile(r"</h[1-6]>", re.IGNORECASE)
+_RE_TAG = re.compile(r"<[^>]+>")
+_RE_MULTINL = re.compile(r"\n{3,}")
+_RE_DDG_RESULT = _ddg_re.compile(
+    r'<a rel="nofollow" class="result__a" href="([^"]+)"[^>]*>([^<]+)</a>'
+)
+_RE_DDG_SNIPPET = _ddg_re.compile(r'<a class="result__snippet"[^>]*>([^<]+)</a>')
+_RE_UDDG = re.compile(r"[?&]uddg=([^&]+)")
+
+# Cap on downloaded body size; enough for max_chars of text after HTML stripping
+MAX_FETCH_BYTES = 200_000
+
+# Recently fetched pages are served from memory for this long
+FETCH_CACHE_TTL = 300.0
+FETCH_CACHE_SIZE = 64
+
+# Below this size the regex pipeline is cheaper than spinning up a DOM parse
+DOM_PARSE_MIN_CHARS = 512
+
+# HTTP/2 needs the optional h2 package; httpx also advertises and decodes br
+# on its own whenever brotli is importable (both come with httpx[http2,brotli])
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Shared across web tools so repeated fetches reuse pooled keep-alive connections
+_client: httpx.AsyncClient | None = None
+
+
+async def _get_client() -> httpx.AsyncClient:
+    """Get the shared HTTP client, creating it on first use"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            follow_redirects=True,
+            timeout=30.0,
+            headers={"User-Agent": "grokCode/1.0"},
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+            http2=HTTP2_AVAILABLE,
+        )
+    return _client
+
+
+async def close_client() -> None:
+    """Close the shared HTTP client (call on app shutdown)"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
 
 class WebFetchTool(Tool):
     """Tool for fetching web content"""
 
     def __init__(self):
-        self._client = None
+        # url -> (fetched_at, text); LRU order, oldest first
+        self._cache: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._inflight: dict[str, asyncio.Future] = {}
 
     @property
     def name(self) -> str:
@@ -47,42 +122,29 @@ Note: Won't work for authenticated pages (login required)."""
     async def execute(self, url: str, prompt: str) -> str:
         # Validate URL
         try:
-            parsed = urlparse(url)
-            if not parsed.scheme:
+            scheme = urlparse(url).scheme
+            if not scheme:
                 url = "https://" + url
-                parsed = urlparse(url)
-            if parsed.scheme not in ("http", "https"):
-                return f"Error: Invalid URL scheme: {parsed.scheme}"
+            elif scheme not in ("http", "https"):
+                return f"Error: Invalid URL scheme: {scheme}"
         except Exception as e:
             return f"Error: Invalid URL: {e}"
 
-        try:
-            async with httpx.AsyncClient(
-                follow_redirects=True,
-                timeout=30.0,
-                headers={"User-Agent": "grokCode/1.0"},
-            ) as client:
-                response = await client.get(url)
-                response.raise_for_status()
-
-                content_type = response.headers.get("content-type", "")
-
-                if "application/json" in content_type:
-                    # Return JSON as-is
-                    text = response.text
-                elif "text/html" in content_type:
-                    # Extract text from HTML
-                    text = self._html_to_text(response.text)
-                else:
-                    text = response.text
-
-                # Truncate if too long
-                max_chars = 50000
-                if len(text) > max_chars:
-                    text = text[:max_chars] + "\n\n... (truncated)"
-
-                return f"Content from {url}:\n\n{text}\n\n---\nUser prompt: {prompt}"
+        hit = self._cache.get(url)
+        if hit and time.monotonic() - hit[0] < FETCH_CACHE_TTL:
+            self._cache.move_to_end(url)
+            return self._format_result(url, hit[1], prompt)
+
+        # Concurrent fetches of the same URL share one request
+        task = self._inflight.get(url)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_text(url))
+            self._inflight[url] = task
+            task.add_done_callback(lambda _: self._inflight.pop(url, None))
 
+        try:
+            text = await asyncio.shield(task)
+            return self._format_result(url, text, prompt)
         except httpx.HTTPStatusError as e:
             return f"Error: HTTP {e.response.status_code} - {e.response.reason_phrase}"
         except httpx.RequestError as e:
@@ -90,41 +152,109 @@ Note: Won't work for authenticated pages (login required)."""
         except Exception as e:
             return f"Error: {e}"
 
+    async def _fetch_text(self, url: str) -> str:
+        """Download url and extract its text (raises httpx errors)"""
+        client = await _get_client()
+        async with client.stream("GET", url) as response:
+            response.raise_for_status()
+            content_type = response.headers.get("content-type", "")
+            cacheable = "no-store" not in response.headers.get("cache-control", "")
+
+            # Read only as much of the body as we could ever return
+            buf = bytearray()
+            async for chunk in response.aiter_bytes():
+                buf.extend(chunk)
+                if len(buf) >= MAX_FETCH_BYTES:
+                    break
+            body = buf.decode(response.encoding or "utf-8", errors="replace")
+            capped = len(buf) >= MAX_FETCH_BYTES
+
+        if "application/json" in content_type:
+            # Return JSON as-is
+            text = body
+        elif "text/html" in content_type:
+            # Extract text from HTML
+            text = self._html_to_text(body)
+        else:
+            text = body
+
+        # Truncate if too long
+        max_chars = 50000
+        if len(text) > max_chars:
+            text = text[:max_chars] + "\n\n... (truncated)"
+        elif capped:
+            text += "\n\n... (truncated)"
+
+        if cacheable:
+            self._cache[url] = (time.monotonic(), text)
+            self._cache.move_to_end(url)
+            if len(self._cache) > FETCH_CACHE_SIZE:
+                self._cache.popitem(last=False)
+
+        return text
+
+    def _format_result(self, url: str, text: str, prompt: str) -> str:
+        return f"Content from {url}:\n\n{text}\n\n---\nUser prompt: {prompt}"
+
     def _html_to_text(self, html: str) -> str:
         """Simple HTML to text conversion"""
-        # Remove script and style elements
-        html = re.sub(r"<script[^>]*>.*?</script>", "", html, flags=re.DOTALL | re.IGNORECASE)
-        html = re.sub(r"<style[^>]*>.*?</style>", "", html, flags=re.DOTALL | re.IGNORECASE)
-
-        # Convert some elements to text equivalents
-        html = re.sub(r"<br\s*/?>", "\n", html, flags=re.IGNORECASE)
-        html = re.sub(r"</?p[^>]*>", "\n\n", html, flags=re.IGNORECASE)
-        html = re.sub(r"</?div[^>]*>", "\n", html, flags=re.IGNORECASE)
-        html = re.sub(r"<li[^>]*>", "\n- ", html, flags=re.IGNORECASE)
-        html = re.sub(r"<h[1-6][^>]*>", "\n\n## ", html, flags=re.IGNORECASE)
-        html = re.sub(r"</h[1-6]>", "\n", html, flags=re.IGNORECASE)
-
-        # Remove remaining tags
-        html = re.sub(r"<[^>]+>", "", html)
-
-        # Decode HTML entities
-        html = html.replace("&nbsp;", " ")
-        html = html.replace("&amp;", "&")
-        html = html.replace("&lt;", "<")
-        html = html.replace("&gt;", ">")
-        html = html.replace("&quot;", '"')
-        html = html.replace("&#39;", "'")
+        if "<" not in html and "&" not in html:
+            # Nothing to strip or decode, only whitespace cleanup
+            text = html
+        elif SELECTOLAX_AVAILABLE and len(html) >= DOM_PARSE_MIN_CHARS:
+            text = self._dom_to_text(html)
+        else:
+            text = self._regex_to_text(html)
 
         # Clean up whitespace
-        lines = [line.strip() for line in html.split("\n")]
+        lines = [line.strip() for line in text.split("\n")]
         lines = [line for line in lines if line]
         text = "\n".join(lines)
 
         # Remove excessive newlines
-        text = re.sub(r"\n{3,}", "\n\n", text)
+        text = _RE_MULTINL.sub("\n\n", text)
 
         return text.strip()
 
+    def _dom_to_text(self, html: str) -> str:
+        """Extract text in a single parse with selectolax (entities decoded by the parser)"""
+        tree = HTMLParser(html)
+        for node in tree.css("script, style"):
+            node.decompose()
+
+        # Same text equivalents as the regex pipeline
+        for node in tree.css("li"):
+            node.insert_before("\n- ")
+        for node in tree.css("h1, h2, h3, h4, h5, h6"):
+            node.insert_before("\n\n## ")
+            node.insert_after("\n")
+        for node in tree.css("p, div, br"):
+            node.insert_before("\n")
+            node.insert_after("\n")
+
+        root = tree.body or tree.root
+        return root.text(separator="") if root else ""
+
+    def _regex_to_text(self, html: str) -> str:
+        """Regex fallback when selectolax isn't installed"""
+        # Remove script and style elements
+        html = _RE_SCRIPT.sub("", html)
+        html = _RE_STYLE.sub("", html)
+
+        # Convert some elements to text equivalents
+        html = _RE_BR.sub("\n", html)
+        html = _RE_P.sub("\n\n", html)
+        html = _RE_DIV.sub("\n", html)
+        html = _RE_LI.sub("\n- ", html)
+        html = _RE_H_OPEN.sub("\n\n## ", html)
+        html = _RE_H_CLOSE.sub("\n", html)
+
+        # Remove remaining tags
+        html = _RE_TAG.sub("", html)
+
+        # Decode HTML entities (full HTML5 table, one pass)
+        return _html.unescape(html)
+
 
 class WebSearchTool(Tool):
     """Tool for web search (using DuckDuckGo)"""
@@ -160,64 +290,75 @@ Use for finding documentation, solutions, or current information."""
 
         try:
             # Use DuckDuckGo HTML search (no API key needed)
-            async with httpx.AsyncClient(
+            client = await _get_client()
+            response = await client.get(
+                "https://html.duckduckgo.com/html/",
+                params={"q": query},
+                headers={"User-Agent": "Mozilla/5.0 (compatible; grokCode/1.0)"},
                 timeout=15.0,
-                headers={
-                    "User-Agent": "Mozilla/5.0 (compatible; grokCode/1.0)",
-                },
-                follow_redirects=True,
-            ) as client:
-                response = await client.get(
-                    "https://html.duckduckgo.com/html/",
-                    params={"q": query},
-                )
-                response.raise_for_status()
+            )
+            response.raise_for_status()
 
-                results = self._parse_ddg_results(response.text, max_results)
+            results = self._parse_ddg_results(response.text, max_results)
 
-                if not results:
-                    return f"No search results found for: {query}"
+            if not results:
+                return f"No search results found for: {query}"
 
-                output = [f"Search results for: {query}\n"]
-                for i, result in enumerate(results, 1):
-                    output.append(f"{i}. {result['title']}")
-                    output.append(f"   URL: {result['url']}")
-                    if result.get("snippet"):
-                        output.append(f"   {result['snippet']}")
-                    output.append("")
+            output = [f"Search results for: {query}\n"]
+            for i, result in enumerate(results, 1):
+                output.append(f"{i}. {result['title']}")
+                output.append(f"   URL: {result['url']}")
+                if result.get("snippet"):
+                    output.append(f"   {result['snippet']}")
+                output.append("")
 
-                return "\n".join(output)
+            return "\n".join(output)
 
         except Exception as e:
             return f"Error performing search: {e}"
 
     def _parse_ddg_results(self, html: str, max_results: int) -> list[dict]:
         """Parse DuckDuckGo HTML results"""
-        results = []
-
-        # Find result blocks
-        result_pattern = r'<a rel="nofollow" class="result__a" href="([^"]+)"[^>]*>([^<]+)</a>'
-        snippet_pattern = r'<a class="result__snippet"[^>]*>([^<]+)</a>'
-
-        matches = re.findall(result_pattern, html)
-        snippets = re.findall(snippet_pattern, html)
+        if SELECTOLAX_AVAILABLE:
+            entries = self._ddg_entries_dom(html, max_results)
+        else:
+            entries = self._ddg_entries_regex(html, max_results)
 
-        for i, (url, title) in enumerate(matches[:max_results]):
-            result = {
-                "title": title.strip(),
-                "url": url,
-                "snippet": snippets[i].strip() if i < len(snippets) else "",
-            }
+        results = []
+        for url, title, snippet in entries:
+            result = {"title": title, "url": url, "snippet": snippet}
             # Clean up DuckDuckGo redirect URLs
-            if "uddg=" in url:
-                try:
-                    from urllib.parse import unquote, parse_qs
-
-                    parsed = parse_qs(urlparse(url).query)
-                    if "uddg" in parsed:
-                        result["url"] = unquote(parsed["uddg"][0])
-                except:
-                    pass
+            m = _RE_UDDG.search(url)
+            if m:
+                result["url"] = unquote(m.group(1))
             results.append(result)
 
         return results
+
+    def _ddg_entries_dom(self, html: str, max_results: int) -> list[tuple[str, str, str]]:
+        """(url, title, snippet) per result block, read with CSS selectors"""
+        entries = []
+        for node in HTMLParser(html).css("div.result"):
+            link = node.css_first("a.result__a")
+            if link is None:
+                continue
+            snippet = node.css_first(".result__snippet")
+            entries.append(
+                (
+                    link.attributes.get("href") or "",
+                    " ".join(link.text().split()),
+                    " ".join(snippet.text().split()) if snippet else "",
+                )
+            )
+            if len(entries) >= max_results:
+                break
+        return entries
+
+    def _ddg_entries_regex(self, html: str, max_results: int) -> list[tuple[str, str, str]]:
+        """Regex fallback when selectolax isn't installed"""
+        matches = _RE_DDG_RESULT.findall(html)
+        snippets = _RE_DDG_SNIPPET.findall(html)
+        return [
+            (url, title.strip(), snippets[i].strip() if i < len(snippets) else "")
+            for i, (url, title) in enumerate(matches[:max_results])
+        ]
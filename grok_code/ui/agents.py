@@ -1,15 +1,27 @@
 """Agent status display - shows background agents like Cursor"""
 
+from collections import deque
+from itertools import islice
 from typing import Optional, Dict
 from dataclasses import dataclass, field
 from datetime import datetime
 from rich.live import Live
 from rich.text import Text
 from rich.panel import Panel
+from rich.markup import escape
 
 from .console import console
 
 
+# Status line markup templates for the agents panel
+_RUNNING_TOOL = "[yellow]● [/yellow][cyan]{type}[/cyan][dim] → {tool}[/dim]"
+_RUNNING_IDLE = "[yellow]● [/yellow][cyan]{type}[/cyan][dim italic] thinking...[/dim italic]"
+_FINISHED = {
+    "completed": "[green]✓ {type}[/green][dim] done[/dim]",
+    "error": "[red]✗ {type}[/red][dim] error[/dim]",
+}
+
+
 @dataclass
 class AgentActivity:
     """Tracks an agent's current activity"""
@@ -21,7 +33,7 @@ class AgentActivity:
     current_tool: Optional[str] = None
     tool_args: Optional[str] = None
     start_time: datetime = field(default_factory=datetime.now)
-    messages: list[str] = field(default_factory=list)
+    messages: deque[str] = field(default_factory=lambda: deque(maxlen=3))  # last 3 only
     tools_used: int = 0
 
 
@@ -31,6 +43,8 @@ class AgentStatusDisplay:
     def __init__(self):
         self._agents: Dict[str, AgentActivity] = {}
         self._live: Optional[Live] = None
+        self._dirty = True
+        self._cached_panel: Optional[Panel] = None
 
     def add_agent(self, agent_id: str, agent_type: str, description: str):
         """Register a new background agent"""
@@ -59,8 +73,6 @@ class AgentStatusDisplay:
             agent.tools_used += 1
         if message:
             agent.messages.append(message)
-            # Keep only last 3 messages
-            agent.messages = agent.messages[-3:]
 
         self._refresh()
 
@@ -86,42 +98,29 @@ class AgentStatusDisplay:
                 border_style="dim",
             )
 
-        rows = []
+        parts = []
         for agent in self._agents.values():
+            agent_type = escape(agent.agent_type)
             # Status indicator
             if agent.status == "running":
-                status = Text("● ", style="yellow")
                 if agent.current_tool:
-                    status.append(f"{agent.agent_type}", style="cyan")
-                    status.append(f" → {agent.current_tool}", style="dim")
+                    line = _RUNNING_TOOL.format(type=agent_type, tool=escape(agent.current_tool))
                     if agent.tool_args:
-                        status.append(f" {agent.tool_args[:30]}", style="dim italic")
+                        line += f" [dim italic]{escape(agent.tool_args[:30])}[/dim italic]"
                 else:
-                    status.append(f"{agent.agent_type}", style="cyan")
-                    status.append(" thinking...", style="dim italic")
-            elif agent.status == "completed":
-                status = Text("✓ ", style="green")
-                status.append(f"{agent.agent_type}", style="green")
-                status.append(" done", style="dim")
+                    line = _RUNNING_IDLE.format(type=agent_type)
             else:
-                status = Text("✗ ", style="red")
-                status.append(f"{agent.agent_type}", style="red")
-                status.append(" error", style="dim")
-
-            rows.append(status)
+                line = _FINISHED.get(agent.status, _FINISHED["error"]).format(type=agent_type)
+            parts.append(line)
 
             # Show description
-            rows.append(Text(f"  {agent.description}", style="dim"))
+            parts.append(f"[dim]  {escape(agent.description)}[/dim]")
 
             # Show recent messages if any
-            for msg in agent.messages[-2:]:
-                rows.append(Text(f"  │ {msg[:60]}", style="dim italic"))
+            recent = islice(agent.messages, max(0, len(agent.messages) - 2), None)
+            parts.extend(f"[dim italic]  │ {escape(msg[:60])}[/dim italic]" for msg in recent)
 
-        content = Text()
-        for i, row in enumerate(rows):
-            content.append_text(row)
-            if i < len(rows) - 1:
-                content.append("\n")
+        content = Text.from_markup("\n".join(parts))
 
         return Panel(
             content,
@@ -130,18 +129,24 @@ class AgentStatusDisplay:
             padding=(0, 1),
         )
 
+    def _render_cached(self) -> Panel:
+        """Render the panel, reusing the last one if no agent state changed"""
+        if self._dirty or self._cached_panel is None:
+            self._cached_panel = self._render()
+            self._dirty = False
+        return self._cached_panel
+
     def _refresh(self):
-        """Refresh the live display"""
-        if self._live:
-            self._live.update(self._render())
+        """Mark the panel stale; Live re-renders it on its own tick"""
+        self._dirty = True
 
     def start(self):
         """Start the live display"""
         if self._agents:
             self._live = Live(
-                self._render(),
+                get_renderable=self._render_cached,
                 console=console,
-                refresh_per_second=4,
+                refresh_per_second=2,
                 transient=False,
             )
             self._live.start()
@@ -155,12 +160,13 @@ class AgentStatusDisplay:
     def show_once(self):
         """Show current status without live updates"""
         if self._agents:
-            console.print(self._render())
+            console.print(self._render_cached())
 
 
 # Global instance
 _agent_display: Optional[AgentStatusDisplay] = None
 _layout_callback = None  # Callback to the chat layout
+_layout_has_set_agent = False  # Cached hasattr(_layout_callback, "set_agent")
 
 
 def get_agent_display() -> AgentStatusDisplay:
@@ -173,8 +179,9 @@ def get_agent_display() -> AgentStatusDisplay:
 
 def set_layout_callback(callback):
     """Set the callback to the chat layout for agent UI updates"""
-    global _layout_callback
+    global _layout_callback, _layout_has_set_agent
     _layout_callback = callback
+    _layout_has_set_agent = callback is not None and hasattr(callback, "set_agent")
 
 
 # Agent type to color mapping
@@ -185,13 +192,14 @@ AGENT_COLORS = {
     "code-reviewer": "#e06c75",  # Red
     "default": "#5f9ea0",  # Teal
 }
+_DEFAULT_COLOR = AGENT_COLORS["default"]
 
 
 def show_agent_start(agent_id: str, agent_type: str, description: str, color: str = None):
     """Show that an agent has started"""
-    if _layout_callback and hasattr(_layout_callback, "set_agent"):
+    if _layout_has_set_agent:
         # Use provided color, or look up by agent type, or fall back to default
-        resolved_color = color or AGENT_COLORS.get(agent_type, AGENT_COLORS["default"])
+        resolved_color = color or AGENT_COLORS.get(agent_type, _DEFAULT_COLOR)
         _layout_callback.set_agent(agent_type, description, resolved_color)
 
 
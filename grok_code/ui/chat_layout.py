@@ -1,13 +1,20 @@
 """Full-screen chat layout - input fixed at bottom, conversation above"""
 
 import asyncio
+import heapq
 import os
 import re
 import time as _time
 import uuid
-from typing import Optional, List
+from bisect import bisect_right
+from collections import deque
+from contextlib import contextmanager
+from functools import lru_cache
+from itertools import zip_longest
+from typing import Iterable, List, Optional
 from prompt_toolkit import Application
 from prompt_toolkit.buffer import Buffer
+from prompt_toolkit.document import Document
 from prompt_toolkit.layout import Layout, HSplit, VSplit, Window, ConditionalContainer
 from prompt_toolkit.layout.controls import BufferControl, FormattedTextControl
 from prompt_toolkit.layout.dimension import Dimension
@@ -15,23 +22,111 @@ from prompt_toolkit.layout.menus import CompletionsMenu
 from prompt_toolkit.key_binding import KeyBindings
 from prompt_toolkit.keys import Keys
 from prompt_toolkit.styles import Style
-from prompt_toolkit.history import FileHistory
 from prompt_toolkit.completion import Completer, Completion
 from prompt_toolkit.filters import has_completions, Condition
 from pathlib import Path
-import glob as globlib
+
+from .completion import (
+    match_paths,
+    plugin_command_index,
+    plugin_commands_lower,
+    plugin_registry,
+    prefix_matches,
+)
+from .history import BufferedFileHistory
 
 # Syntax highlighting
 try:
     from pygments import highlight
     from pygments.lexers import get_lexer_by_name, guess_lexer, TextLexer
     from pygments.formatters import Terminal256Formatter
+    from pygments.token import Token
     from pygments.util import ClassNotFound
 
     PYGMENTS_AVAILABLE = True
 except ImportError:
     PYGMENTS_AVAILABLE = False
 
+# Faster event loop for keystroke/spinner scheduling
+try:
+    import uvloop
+
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
+
+@lru_cache(maxsize=64)
+def _lexer(name: str):
+    """Pygments lexer for a language name, resolved once per name"""
+    try:
+        return get_lexer_by_name(name, stripall=True)
+    except ClassNotFound:
+        return TextLexer()
+
+
+@lru_cache(maxsize=64)
+def _guess_lexer(code: str):
+    """Pygments lexer guessed from code, remembered for identical snippets"""
+    try:
+        return guess_lexer(code)
+    except ClassNotFound:
+        return TextLexer()
+
+
+def _split_token_lines(tokens) -> tuple[tuple[tuple[str, str], ...], ...]:
+    """Split (style, text) tokens into per-line token tuples, dropping an empty last line"""
+    lines = []
+    current = []
+    for style, text in tokens:
+        if "\n" not in text:
+            current.append((style, text))
+            continue
+        first, *rest = text.split("\n")
+        if first:
+            current.append((style, first))
+        for part in rest:
+            lines.append(tuple(current))
+            current = [(style, part)] if part else []
+    if current:
+        lines.append(tuple(current))
+    return tuple(lines)
+
+
+@lru_cache(maxsize=128)
+def _highlight_lines(code: str, lang: str) -> tuple[tuple[tuple[str, str], ...], ...]:
+    """Highlighted code block as per-line (style, text) tokens, memoized per (code, lang)"""
+    lexer = _lexer(lang) if lang else _guess_lexer(code)
+
+    # Token to color mapping (One Dark theme inspired)
+    token_colors = {
+        Token.Keyword: "#c678dd",  # Purple
+        Token.Keyword.Namespace: "#c678dd",
+        Token.Keyword.Type: "#e5c07b",
+        Token.Name.Function: "#61afef",  # Blue
+        Token.Name.Class: "#e5c07b",  # Yellow
+        Token.Name.Builtin: "#56b6c2",  # Cyan
+        Token.Name.Decorator: "#e5c07b",
+        Token.String: "#98c379",  # Green
+        Token.Number: "#d19a66",  # Orange
+        Token.Operator: "#56b6c2",
+        Token.Comment: "#5c6370 italic",  # Gray italic
+        Token.Punctuation: "#abb2bf",
+        Token.Name: "#e06c75",  # Red for names
+        Token.Name.Variable: "#e06c75",
+    }
+
+    result = []
+    for token_type, value in lexer.get_tokens(code):
+        # Find matching color (check parent types too)
+        color = "#abb2bf"  # Default
+        for t in token_type.split():
+            if t in token_colors:
+                color = token_colors[t]
+                break
+        result.append((color, value))
+    return _split_token_lines(result)
+
 
 class InterruptedInput:
     pass
@@ -74,47 +169,116 @@ COMMANDS = {
     "exit": "Exit",
 }
 
+# (lowercased name, name, "/name", description) - built once for per-keystroke matching
+_COMMANDS_LOWER = [(cmd.lower(), cmd, f"/{cmd}", desc) for cmd, desc in COMMANDS.items()]
 
-def get_plugin_commands() -> dict[str, str]:
-    """Get commands from loaded plugins"""
-    try:
-        from ..plugins.registry import PluginRegistry
-
-        registry = PluginRegistry.get_instance()
-        cmds = {}
-        for cmd in registry.list_commands():
-            desc = cmd.description[:35] + "..." if len(cmd.description) > 35 else cmd.description
-            cmds[cmd.name] = desc
-        return cmds
-    except Exception:
-        return {}
+# Resolved on first use; imported lazily to keep UI startup light
+_PERMISSIONS = None
+
+
+def _permissions():
+    """Get the (PermissionManager, ApprovalMode) classes"""
+    global _PERMISSIONS
+    if _PERMISSIONS is None:
+        from ..permissions import PermissionManager, ApprovalMode
+
+        _PERMISSIONS = (PermissionManager, ApprovalMode)
+    return _PERMISSIONS
+
+
+# Matched against the buffer head so the whole input is never lowercased
+_LOAD_HIST_RE = re.compile(r"/load history", re.IGNORECASE)
+_LOAD_HIST_LEN = len("/load history")
+
+
+def _find_mention(text: str) -> int:
+    """Index of the active @ mention in text, or -1"""
+    # A mention is the word at the cursor, so only text after the last break is searched
+    word_start = max(text.rfind(" "), text.rfind("\n")) + 1
+    return text.rfind("@", word_start)
+
+
+# Most @ path matches any consumer shows (the completion menu)
+_AT_MATCH_LIMIT = 15
+
+# (prefix, matches) for the last @ prefix - the completer and the helper line
+# both resolve the same prefix on each keystroke
+_AT_CACHE: Optional[tuple[str, list[tuple[str, bool]]]] = None
+
+
+def _resolve_at_matches(prefix: str) -> list[tuple[str, bool]]:
+    """Path matches for an @ mention, shared by the completer and helper line"""
+    global _AT_CACHE
+    if _AT_CACHE is None or _AT_CACHE[0] != prefix:
+        _AT_CACHE = (prefix, match_paths(prefix, _AT_MATCH_LIMIT))
+    return _AT_CACHE[1]
+
+
+def _clear_at_cache():
+    """Forget the last @ matches so the next mention re-reads the filesystem"""
+    global _AT_CACHE
+    _AT_CACHE = None
+
+
+_HISTORY_DATE_RE = re.compile(r"conversation_(\d{4})(\d{2})(\d{2})")
+
+# history dir -> (mtime_ns, entries)
+_HIST_CACHE: dict[str, tuple[int, list[tuple[str, str]]]] = {}
 
 
 def get_history_files() -> list[tuple[str, str]]:
     """Get available history files for completion"""
     try:
         history_dir = Path(os.getcwd()) / ".grok" / "history"
-        if not history_dir.exists():
+        try:
+            mtime_ns = history_dir.stat().st_mtime_ns
+        except FileNotFoundError:
             return []
-        files = sorted(history_dir.glob("*.md"), reverse=True)
+        key = str(history_dir)
+        cached = _HIST_CACHE.get(key)
+        if cached and cached[0] == mtime_ns:
+            return cached[1]
+
+        # Newest 10 without sorting the whole directory
         result = []
-        for f in files[:10]:
+        for f in heapq.nlargest(10, history_dir.glob("*.md")):
             # Extract date from filename for display
-            name = f.stem
-            if name.startswith("conversation_"):
-                date_part = name[13:]  # Remove "conversation_"
-                if len(date_part) >= 8:
-                    desc = f"{date_part[:4]}-{date_part[4:6]}-{date_part[6:8]}"
-                else:
-                    desc = ""
-            else:
-                desc = ""
+            m = _HISTORY_DATE_RE.match(f.stem)
+            desc = f"{m.group(1)}-{m.group(2)}-{m.group(3)}" if m else ""
             result.append((f.name, desc))
+        _HIST_CACHE[key] = (mtime_ns, result)
         return result
     except Exception:
         return []
 
 
+# Built-in agents for @ mentions: (lowercased name, name, description)
+_BUILTIN_AGENTS_LOWER = [
+    (name.lower(), name, desc)
+    for name, desc in (
+        ("explore", "Fast codebase exploration and search"),
+        ("plan", "Design implementation approaches"),
+        ("general", "General-purpose multi-step tasks"),
+    )
+]
+
+# Helper-line rendering of @ mention / history matches, by match type
+_MATCH_STYLE = {
+    "agent": "#e06c75",  # Red/pink for agents
+    "plan": "#98c379",  # Green for plans
+    "dir": "#5f9ea0",  # Cyan for directories
+    "history": "#c678dd",  # Purple for history files
+    "file": "#808080",  # Gray for files
+}
+_MATCH_DISPLAY = {
+    "agent": lambda name, desc: name[6:],  # Strip "agent:"
+    "plan": lambda name, desc: f"{name[5:]} ({desc})" if desc else name[5:],  # Strip "plan:"
+    "dir": lambda name, desc: os.path.basename(name) + "/",
+    "history": lambda name, desc: f"{name} ({desc})" if desc else name,
+    "file": lambda name, desc: os.path.basename(name),
+}
+
+
 class ChatCompleter(Completer):
     """Completer for slash commands and @ file mentions"""
 
@@ -122,7 +286,7 @@ class ChatCompleter(Completer):
         text = document.text_before_cursor
 
         # Special case: /load history <file> completion
-        if text.lower().startswith("/load history "):
+        if text[_LOAD_HIST_LEN : _LOAD_HIST_LEN + 1] == " " and _LOAD_HIST_RE.match(text):
             file_prefix = text[14:].lower()  # After "/load history "
             for filename, date_desc in get_history_files():
                 if not file_prefix or filename.lower().startswith(file_prefix):
@@ -134,42 +298,33 @@ class ChatCompleter(Completer):
                     )
             return
 
-        if text.startswith("/"):
+        if text[:1] == "/":
             prefix = text[1:].lower()
-            for cmd, desc in COMMANDS.items():
-                if not prefix or cmd.startswith(prefix):
-                    yield Completion(
-                        "/" + cmd,
-                        start_position=-len(text),
-                        display=f"/{cmd}",
-                        display_meta=desc,
-                    )
-            for cmd, desc in get_plugin_commands().items():
-                if not prefix or cmd.startswith(prefix):
+            start = -len(text)
+            for cmd_lower, _, slash_cmd, desc in _COMMANDS_LOWER:
+                if cmd_lower.startswith(prefix):
                     yield Completion(
-                        "/" + cmd,
-                        start_position=-len(text),
-                        display=f"/{cmd}",
-                        display_meta=desc,
+                        slash_cmd, start_position=start, display=slash_cmd, display_meta=desc
                     )
+            plugin_index = plugin_command_index(plugin_commands_lower())
+            for _, _, slash_cmd, desc in prefix_matches(plugin_index, prefix):
+                yield Completion(
+                    slash_cmd, start_position=start, display=slash_cmd, display_meta=desc
+                )
+            return
 
-        elif "@" in text:
-            at_idx = text.rfind("@")
+        at_idx = _find_mention(text)
+        if at_idx >= 0:
             path_prefix = text[at_idx + 1 :]
-            search_path = path_prefix + "*" if path_prefix else "*"
-            try:
-                matches = globlib.glob(search_path)
-                for match in sorted(matches)[:15]:
-                    basename = os.path.basename(match)
-                    if os.path.isdir(match):
-                        basename += "/"
-                    yield Completion(
-                        match,
-                        start_position=-len(path_prefix) if path_prefix else 0,
-                        display=basename,
-                    )
-            except Exception:
-                pass
+            for match, is_dir in _resolve_at_matches(path_prefix):
+                basename = os.path.basename(match)
+                if is_dir:
+                    basename += "/"
+                yield Completion(
+                    match,
+                    start_position=-len(path_prefix) if path_prefix else 0,
+                    display=basename,
+                )
 
 
 STYLE = Style.from_dict(
@@ -213,9 +368,197 @@ STYLE = Style.from_dict(
 )
 
 
+# Output lines kept for scrollback; older turns are dropped past this
+_MAX_OUTPUT_LINES = 5000
+
+# Line break token; every formatted line ends with this one shared tuple
+_NL = ("", "\n")
+
+# Live agent status spinner fragments, advanced at 2 Hz
+_AGENT_SPINNER = tuple(("#61afef", f"  {frame} ") for frame in "◐◓◑◒")
+
+# Bursts of invalidations (streaming, rapid tool calls) redraw at most ~30 times/s
+_MIN_REDRAW_INTERVAL = 1 / 30
+
+# Second Esc within this window (with empty input) interrupts
+_ESCAPE_WINDOW_NS = 1_000_000_000
+
+# Inline formatting: ***bold italic***, **bold**, *italic*, `code`
+_INLINE_MD_RE = re.compile(r"(\*\*\*(.+?)\*\*\*|\*\*(.+?)\*\*|\*(.+?)\*|`([^`]+)`)")
+_NUMBERED_ITEM_RE = re.compile(r"(\d+)\.\s+(.*)$")
+
+# First characters of unindented lines that need more than inline markdown:
+# markers, code fences, tables, user input, thinking, headers, assistant start
+_BLOCK_LEAD_CHARS = frozenset("@`|>#\u2733\u23fa")
+
+# Table separator row: only pipes, dashes, colons and spaces (|---|:---:|)
+_TABLE_SEP_RE = re.compile(r"\|[\s:|-]+\|")
+
+# Markdown header (style, format) by level; h1 text is also upper-cased
+_HEADER_FORMATS = (
+    None,
+    ("bold", "{indent}\u2550 {text} \u2550"),
+    ("bold", "{indent}\u2500 {text} \u2500"),
+    ("bold #61afef", "{indent}{text}"),
+    ("#56b6c2", "{indent}{text}"),  # Cyan for h4
+)
+
+# Output line markers: block/tool markers start the line, result and diff
+# markers may be indented under their tool line
+_MARKER_RE = re.compile(
+    r"@@(AGENT_START|AGENT_LIVE|AGENT_END|TOOL|PLAN_TASK)@@ |\s*@@(RESULT|DIFF_REMOVE|DIFF_ADD)@@ "
+)
+
+
+# Display names of built-in tools in the output; others are title-cased
+_TOOL_DISPLAY = {
+    "read_file": "Read",
+    "read": "Read",
+    "write_file": "Write",
+    "write": "Write",
+    "edit_file": "Update",
+    "edit": "Update",
+    "bash": "Bash",
+    "bash_output": "Bash",
+    "glob": "Glob",
+    "grep": "Grep",
+    "task": "Agent",
+}
+
+
+@lru_cache(maxsize=128)
+def _tool_display_name(tool_name: str) -> str:
+    """Get the display name for a tool call"""
+    return _TOOL_DISPLAY.get(tool_name) or tool_name.replace("_", " ").title()
+
+
+@lru_cache(maxsize=32)
+def _agent_header(payload: str) -> tuple:
+    """Build the header tokens for an @@AGENT_START@@ name|task|color payload"""
+    parts = payload.split("|")
+    agent_name = parts[0] if parts else "agent"
+    agent_task = parts[1] if len(parts) > 1 else ""
+    agent_color = parts[2] if len(parts) > 2 else "#5f9ea0"
+
+    result = [_NL, (f"bg:{agent_color} #1e1e1e bold", f" \u23fa {agent_name} ")]
+    if agent_task:
+        display_task = agent_task[:50] + "..." if len(agent_task) > 50 else agent_task
+        result.append(("#abb2bf", f" {display_task}"))
+    result.append(_NL)
+    return tuple(result)
+
+
+@lru_cache(maxsize=1)
+def _live_task_lines(version: int) -> tuple:
+    """Build the live task list shown under an agent's status for a TaskStore version"""
+    from ..tools.tasks import TaskStore, TaskStatus
+
+    result = []
+    for task in TaskStore.get_instance().list_all()[:10]:  # Limit to 10 tasks
+        if task.status == TaskStatus.COMPLETED:
+            result.append(("#98c379", "    ✓ "))
+            result.append(("#5c6370 strike", f"{task.subject[:50]}"))
+        elif task.status == TaskStatus.IN_PROGRESS:
+            result.append(("#e5c07b", "    ◐ "))
+            result.append(("#abb2bf", f"{task.subject[:50]}"))
+        else:
+            result.append(("#5c6370", "    ○ "))
+            result.append(("#abb2bf", f"{task.subject[:50]}"))
+        result.append(_NL)
+    return tuple(result)
+
+
+# Visibility flags for conditional UI sections, kept in ChatLayout._ui_flags
+F_QUEUED = 1
+F_STATUS = 2
+F_HELPER = 4
+F_MULTILINE = 8
+F_MATCHES = 16
+
+
 class ChatLayout:
     """Full-screen chat with fixed input at bottom, output scrolling above"""
 
+    # Fixed attribute layout: the render callbacks read these every frame
+    __slots__ = (
+        # Input history/completion
+        "history",
+        "completer",
+        # State
+        "_ui_flags",
+        "_batch_depth",
+        "_batch_dirty",
+        "mode_idx",
+        "files_changed",
+        "lines_added",
+        "lines_removed",
+        "_status_text",
+        "status_time",
+        "status_start",
+        "input_tokens",
+        "output_tokens",
+        # Spinner
+        "_spinner_idx",
+        "_spinner_task",
+        "_spinner_frames",
+        # Output
+        "_output_lines",
+        "_output_version",
+        "_output_volatile",
+        "_output_cache",
+        "_output_cache_key",
+        "_output_line_count",
+        "_output_cursor_y",
+        "_fmt_cache",
+        "_fmt_upto",
+        "_fmt_line_starts",
+        # Queue / approval / helper
+        "_queued_messages",
+        "_is_busy",
+        "_waiting_approval",
+        "_approval_response",
+        "_helper_text_value",
+        "_file_matches_value",
+        "_file_match_prefix",
+        # Agent
+        "_current_agent",
+        "_current_agent_task",
+        "_agent_color",
+        "_tool_calls_collapsed",
+        "_agent_tool_count",
+        "_agent_start_time",
+        "_agent_status",
+        "_agent_live_id",
+        "_live_gen",
+        "_live_status",
+        # Input handling
+        "_input_ready",
+        "_current_input",
+        "_interrupted",
+        "_exit",
+        "_auto_scroll",
+        "_scroll_position",
+        "_pasted_content",
+        "_last_text_len",
+        "_last_escape_ns",
+        "_escape_clear_task",
+        # Terminal size
+        "_term_w",
+        "_term_h",
+        "_sep_cache",
+        # prompt_toolkit objects
+        "output_control",
+        "output_window",
+        "status_window",
+        "input_buffer",
+        "input_control",
+        "input_window",
+        "multiline_indicator",
+        "kb",
+        "layout",
+        "app",
+    )
+
     SPINNER_FRAMES = [
         "\u280b",
         "\u2819",
@@ -236,9 +579,15 @@ class ChatLayout:
             history_dir.mkdir(exist_ok=True)
             history_file = str(history_dir / "history")
 
-        self.history = FileHistory(history_file)
+        self.history = BufferedFileHistory(history_file)
         self.completer = ChatCompleter()
 
+        # Bitmask of F_* flags, updated as the state below changes
+        self._ui_flags = 0
+        # Redraws requested inside batch_updates() wait for the outermost exit
+        self._batch_depth = 0
+        self._batch_dirty = False
+
         # State
         self.mode_idx = 0
         self.files_changed = 0
@@ -256,9 +605,21 @@ class ChatLayout:
 
         # Output accumulator
         self._output_lines: List[str] = []
+        # Formatted output cache - rebuilt only when the key below changes
+        self._output_version = 0  # Bumped whenever _output_lines changes
+        self._output_volatile = False  # Live agent/task lines re-render per spinner frame
+        self._output_cache: list = []
+        self._output_cache_key: tuple = ()
+        self._output_line_count = 0  # Formatted lines in the last render
+        self._output_cursor_y = 0  # Line breaks in _output_cache (cursor row)
+        # Formatted tuples for _output_lines[:_fmt_upto]; only appended lines are re-parsed
+        self._fmt_cache: list = []
+        self._fmt_upto = 0
+        # Token offsets in _fmt_cache where each formatted line starts
+        self._fmt_line_starts: list[int] = [0]
 
         # Message queue
-        self._queued_messages: List[dict] = []
+        self._queued_messages: deque[str] = deque()
         self._is_busy = False
 
         # Approval state
@@ -280,7 +641,11 @@ class ChatLayout:
         self._agent_tool_count: int = 0  # Count of tool calls in current agent block
         self._agent_start_time: float = 0.0
         self._agent_status: str = ""  # Current agent status text
-        self._agent_live_idx: int = -1  # Index of live status line in _output_lines
+        # Live agent status is kept beside the output: the @@AGENT_LIVE@@ line only
+        # carries an id, so updates never rewrite or pop lines in _output_lines
+        self._agent_live_id: str = ""  # Id of the current agent's live line
+        self._live_gen: int = 0  # Last live line id handed out
+        self._live_status: dict[str, tuple[str, int]] = {}  # id -> (status, tool count)
 
         # Input handling
         self._input_ready = asyncio.Event()
@@ -292,28 +657,110 @@ class ChatLayout:
 
         # Paste masking
         self._pasted_content: Optional[str] = None  # Stores actual pasted content
-        self._last_escape_time = 0.0  # For escape-twice-to-clear
+        self._last_text_len = 0  # Input length at the previous text change
+        self._last_escape_ns = 0  # For escape-twice-to-clear (monotonic_ns)
         self._escape_clear_task: Optional[asyncio.Task] = None
 
+        # Terminal size, refreshed on SIGWINCH rather than queried every frame
+        self._refresh_terminal_size()
+
         self._setup_layout()
 
-    def _get_terminal_width(self) -> int:
+    def _invalidate(self):
+        """Request a redraw, deferred while inside batch_updates()"""
+        if self._batch_depth:
+            self._batch_dirty = True
+        elif self.app.is_running:
+            self.app.invalidate()
+
+    @contextmanager
+    def batch_updates(self):
+        """Group several output/status changes into a single redraw"""
+        self._batch_depth += 1
         try:
-            return os.get_terminal_size().columns
-        except OSError:
-            return 80
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth and self._batch_dirty:
+                self._batch_dirty = False
+                self._invalidate()
+
+    def _set_ui_flag(self, flag: int, on: bool):
+        """Set or clear a visibility flag"""
+        if on:
+            self._ui_flags |= flag
+        else:
+            self._ui_flags &= ~flag
 
-    def _get_terminal_height(self) -> int:
+    @property
+    def status_text(self) -> str:
+        return self._status_text
+
+    @status_text.setter
+    def status_text(self, text: str):
+        self._status_text = text
+        self._set_ui_flag(F_STATUS, bool(text))
+        # Pick the spinner once per status change rather than every frame
+        if "Thinking" in text or "thinking" in text:
+            self._spinner_frames = self.SPINNER_THINKING
+        else:
+            self._spinner_frames = self.SPINNER_FRAMES
+
+    @property
+    def _helper_text(self) -> str:
+        return self._helper_text_value
+
+    @_helper_text.setter
+    def _helper_text(self, text: str):
+        self._helper_text_value = text
+        self._set_ui_flag(F_HELPER, bool(text))
+
+    @property
+    def _file_matches(self) -> list:
+        return self._file_matches_value
+
+    @_file_matches.setter
+    def _file_matches(self, matches: list):
+        self._file_matches_value = matches
+        self._set_ui_flag(F_MATCHES, bool(matches))
+
+    @classmethod
+    def use_uvloop(cls) -> bool:
+        """Install uvloop's event loop policy if available (call before the loop starts)"""
+        if not UVLOOP_AVAILABLE:
+            return False
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        return True
+
+    def _refresh_terminal_size(self):
+        """Re-read the terminal size and rebuild the separator line"""
         try:
-            return os.get_terminal_size().lines
+            size = os.get_terminal_size()
+            self._term_w, self._term_h = size.columns, size.lines
         except OSError:
-            return 24
+            self._term_w, self._term_h = 80, 24
+        self._sep_cache = [("class:separator", "\u2500" * self._term_w)]
+
+    def _sync_terminal_size(self):
+        """Pick up resizes from the size prompt_toolkit renders with"""
+        try:
+            size = self.app.output.get_size()
+        except Exception:
+            return
+        if size.columns != self._term_w or size.rows != self._term_h:
+            self._term_w, self._term_h = size.columns, size.rows
+            self._sep_cache = [("class:separator", "\u2500" * self._term_w)]
+
+    def _get_terminal_width(self) -> int:
+        return self._term_w
+
+    def _get_terminal_height(self) -> int:
+        return self._term_h
 
     def _do_scroll(self, delta: int):
         """Scroll the output pane. Negative delta = show older content (up)"""
-        # Estimate max scroll - use raw lines * 2 to account for formatting expansion
-        # This ensures we can always scroll to the top
-        max_scroll = len(self._output_lines) * 2
+        # Formatted line count from the last render is the furthest we can scroll
+        max_scroll = self._output_line_count
 
         if delta < 0:
             # Scrolling up - show older content
@@ -324,8 +771,7 @@ class ChatLayout:
             self._scroll_position = max(0, self._scroll_position - delta)
             if self._scroll_position == 0:
                 self._auto_scroll = True
-        if self.app.is_running:
-            self.app.invalidate()
+        self._invalidate()
 
     def _setup_layout(self):
         """Set up the prompt_toolkit layout"""
@@ -351,13 +797,12 @@ class ChatLayout:
                 content=FormattedTextControl(self._get_status_line),
                 height=1,
             ),
-            filter=Condition(lambda: bool(self.status_text)),
+            filter=Condition(lambda: self._ui_flags & F_STATUS),
         )
 
         # Separator
         def get_sep():
-            width = self._get_terminal_width()
-            return [("class:separator", "\u2500" * width)]
+            return self._sep_cache
 
         sep_line = Window(
             content=FormattedTextControl(get_sep),
@@ -371,7 +816,7 @@ class ChatLayout:
                 content=FormattedTextControl(self._get_queue_display),
                 height=Dimension(min=1, max=5),
             ),
-            filter=Condition(self._has_queued),
+            filter=Condition(lambda: self._ui_flags & F_QUEUED),
         )
 
         # Input - multiline enabled for paste support
@@ -397,9 +842,7 @@ class ChatLayout:
                 height=1,
                 style="class:helper",
             ),
-            filter=Condition(
-                lambda: "\n" in self.input_buffer.text and self._pasted_content is None
-            ),
+            filter=Condition(lambda: self._ui_flags & F_MULTILINE),
         )
 
         input_area = HSplit(
@@ -432,7 +875,7 @@ class ChatLayout:
                 height=1,
                 style="class:helper",
             ),
-            filter=Condition(lambda: bool(self._helper_text) or bool(self._file_matches)),
+            filter=Condition(lambda: self._ui_flags & (F_HELPER | F_MATCHES)),
         )
 
         # Toolbar
@@ -459,7 +902,7 @@ class ChatLayout:
         def handle_shift_tab(event):
             self.mode_idx = (self.mode_idx + 1) % len(MODES)
             # Sync with permission manager
-            from ..permissions import PermissionManager, ApprovalMode
+            PermissionManager, ApprovalMode = _permissions()
             perm_mgr = PermissionManager.get_instance()
             mode_name = MODES[self.mode_idx]
             perm_mgr.set_mode(ApprovalMode(mode_name))
@@ -471,24 +914,24 @@ class ChatLayout:
                 buf.cancel_completion()
                 return
 
-            now = _time.time()
+            now = _time.monotonic_ns()
 
             # If there's text in input, first escape clears it
             if buf.text:
                 buf.text = ""
                 self._pasted_content = None
-                self._last_escape_time = now
+                self._last_escape_ns = now
                 return
 
             # No text - check for double escape to interrupt
-            if now - self._last_escape_time < 1.0:
+            if now - self._last_escape_ns < _ESCAPE_WINDOW_NS:
                 # Double escape with no text = interrupt
                 self._interrupted = True
                 self._input_ready.set()
-                self._last_escape_time = 0.0
+                self._last_escape_ns = 0
                 self._helper_text = ""
             else:
-                self._last_escape_time = now
+                self._last_escape_ns = now
                 if self._is_busy:
                     self._helper_text = "Press Esc again to interrupt"
 
@@ -498,16 +941,15 @@ class ChatLayout:
                             await asyncio.sleep(1.5)
                             if self._helper_text == "Press Esc again to interrupt":
                                 self._helper_text = ""
-                                self._last_escape_time = 0.0
-                                if self.app.is_running:
-                                    self.app.invalidate()
+                                self._last_escape_ns = 0
+                                self._invalidate()
                         except asyncio.CancelledError:
                             pass
 
                     if self._escape_clear_task and not self._escape_clear_task.done():
                         self._escape_clear_task.cancel()
                     self._escape_clear_task = asyncio.create_task(clear_escape_hint())
-                    self.app.invalidate()
+                    self._invalidate()
 
         @self.kb.add("up")
         def handle_up(event):
@@ -515,9 +957,10 @@ class ChatLayout:
             if not buf.text and self._queued_messages:
                 # Pop the last message from queue to edit it
                 msg = self._queued_messages.pop()
+                self._set_ui_flag(F_QUEUED, bool(self._queued_messages))
                 buf.text = msg
                 buf.cursor_position = len(buf.text)
-                self.app.invalidate()
+                self._invalidate()
             else:
                 buf.history_backward()
 
@@ -548,22 +991,21 @@ class ChatLayout:
             # Jump to bottom
             self._scroll_position = 0
             self._auto_scroll = True
-            self.app.invalidate()
+            self._invalidate()
 
         @self.kb.add("home", eager=True)
         def handle_home(event):
             # Jump to top
             self._auto_scroll = False
-            formatted = self._get_output_text()
-            line_count = sum(1 for style, text in formatted if text == "\n")
-            self._scroll_position = line_count
-            self.app.invalidate()
+            self._scroll_position = self._output_line_count
+            self._invalidate()
 
         @self.kb.add("c-o")
         def handle_ctrl_o(event):
             # Toggle tool call collapse/expand
             self._tool_calls_collapsed = not self._tool_calls_collapsed
-            self.app.invalidate()
+            self._reset_format_cache()
+            self._invalidate()
 
         @self.kb.add("/")
         def handle_slash(event):
@@ -582,8 +1024,8 @@ class ChatLayout:
         def handle_tab(event):
             buf = event.current_buffer
             # If we have file matches for @ mentions
-            if self._file_matches and "@" in buf.text:
-                at_idx = buf.text.rfind("@")
+            at_idx = _find_mention(buf.text) if self._file_matches else -1
+            if at_idx >= 0:
                 # Replace from @ to cursor with selected match
                 match_type, name, desc = self._file_matches[0]
                 if match_type == "dir":
@@ -593,7 +1035,7 @@ class ChatLayout:
                 buf.cursor_position = len(new_text)
                 self._clear_file_matches()
             # If we have history matches for /load history
-            elif self._file_matches and buf.text.lower().startswith("/load history"):
+            elif self._file_matches and _LOAD_HIST_RE.match(buf.text):
                 match_type, name, desc = self._file_matches[0]
                 new_text = f"/load history {name}"
                 buf.text = new_text
@@ -650,103 +1092,90 @@ class ChatLayout:
             style=STYLE,
             full_screen=True,
             mouse_support=True,
+            min_redraw_interval=_MIN_REDRAW_INTERVAL,
         )
 
     def _on_text_changed(self, buff: Buffer):
         """Detect multiline paste, @ file mentions, /load history, and update helper text"""
         text = buff.text
+        grew = len(text) - self._last_text_len
+        self._last_text_len = len(text)
 
         # If we already have masked content, don't re-process
         if self._pasted_content is not None:
+            self._ui_flags &= ~F_MULTILINE
             return
 
         # Check for /load history command
-        if text.lower().startswith("/load history"):
+        if _LOAD_HIST_RE.match(text):
             if len(text) > 13:  # Has space after "history"
                 file_prefix = text[14:] if len(text) > 14 else ""
                 self._update_history_matches(file_prefix)
             else:
                 self._update_history_matches("")
-        # Check for @ file mention
-        elif "@" in text:
-            at_idx = text.rfind("@")
-            path_prefix = text[at_idx + 1 :]
+        else:
+            # Check for @ file mention
+            at_idx = _find_mention(text)
             # Only show matches if we're at the end of the @ mention (cursor after @)
-            if buff.cursor_position > at_idx:
-                self._update_file_matches(path_prefix)
+            if at_idx >= 0 and buff.cursor_position > at_idx:
+                self._update_file_matches(text[at_idx + 1 :])
             else:
                 self._clear_file_matches()
-        else:
-            self._clear_file_matches()
 
-        # Detect multiline paste (more than 1 newline suggests paste)
-        if "\n" in text and text.count("\n") >= 1:
-            lines = text.split("\n")
-            line_count = len(lines)
+        # A single typed character that isn't a newline can't be a paste
+        if grew == 1 and text[buff.cursor_position - 1 : buff.cursor_position] != "\n":
+            return
+
+        # Detect multiline paste (any newline suggests paste)
+        first_nl = text.find("\n")
+        self._set_ui_flag(F_MULTILINE, first_nl >= 0)
+        if first_nl >= 0:
+            # Count lines without materializing the split of a large paste
+            extra_lines = text.count("\n", first_nl)
 
             # Create mask
-            first_line = lines[0][:30]
-            if len(lines[0]) > 30:
+            first_line = text[: min(first_nl, 30)]
+            if first_nl > 30:
                 first_line += "..."
 
             # Store actual content and replace with mask
             self._pasted_content = text
-            mask = f"[{first_line} +{line_count - 1} lines]"
-            buff.text = mask
-            buff.cursor_position = len(mask)
+            mask = f"[{first_line} +{extra_lines} lines]"
+            # One document swap fires a single (no-op) text-changed callback
+            buff.set_document(Document(mask, len(mask)), bypass_readonly=True)
 
     def _update_file_matches(self, prefix: str):
         """Update file matches for @ mention (files and agents)"""
         self._file_match_prefix = prefix
         matches = []
 
-        # Built-in agents (always available)
-        builtin_agents = [
-            ("explore", "Fast codebase exploration and search"),
-            ("plan", "Design implementation approaches"),
-            ("general", "General-purpose multi-step tasks"),
-        ]
+        # "@agent:ex" and "@ex" both match agents starting with "ex"
+        prefix_l = prefix.lower()
+        agent_mode = prefix_l.startswith("agent:")
+        needle = prefix_l[6:] if agent_mode else prefix_l
 
         # Add built-in agents
-        for name, desc in builtin_agents:
-            if (
-                not prefix
-                or name.lower().startswith(prefix.lower())
-                or (
-                    prefix.lower().startswith("agent:")
-                    and name.lower().startswith(prefix[6:].lower())
-                )
-            ):
+        for name_l, name, desc in _BUILTIN_AGENTS_LOWER:
+            if name_l.startswith(needle):
                 matches.append(("agent", f"agent:{name}", desc))
 
         # Get plugin/custom agents
         try:
-            from ..plugins.registry import PluginRegistry
-
-            registry = PluginRegistry.get_instance()
-            for agent in registry.list_agents():
-                agent_name = f"agent:{agent.name}"
-                if (
-                    not prefix
-                    or agent.name.lower().startswith(prefix.lower())
-                    or (
-                        prefix.lower().startswith("agent:")
-                        and agent.name.lower().startswith(prefix[6:].lower())
-                    )
-                ):
-                    matches.append(("agent", agent_name, agent.description))
+            for agent in plugin_registry().list_agents():
+                if agent.name_lower.startswith(needle):
+                    matches.append(("agent", f"agent:{agent.name}", agent.description))
         except Exception:
             pass
 
         # Get plan files for @plan: mentions
-        if not prefix or prefix.lower().startswith("plan") or prefix.lower().startswith("plan:"):
+        if not prefix or prefix_l.startswith("plan"):
             try:
                 plans_dir = Path(os.getcwd()) / ".grok" / "plans"
                 if plans_dir.exists():
-                    plan_prefix = prefix[5:] if prefix.lower().startswith("plan:") else ""
-                    for plan_file in sorted(plans_dir.glob("*.md"), reverse=True)[:5]:
+                    plan_prefix = prefix_l[5:] if prefix_l.startswith("plan:") else ""
+                    for plan_file in heapq.nlargest(5, plans_dir.glob("*.md")):
                         plan_name = plan_file.stem
-                        if not plan_prefix or plan_name.lower().startswith(plan_prefix.lower()):
+                        if not plan_prefix or plan_name.lower().startswith(plan_prefix):
                             # Extract date from filename for description
                             desc = ""
                             if "_" in plan_name:
@@ -757,21 +1186,16 @@ class ChatLayout:
             except Exception:
                 pass
 
-        # Get file matches (only if not explicitly looking for agents or plans)
-        if not prefix.lower().startswith("agent:") and not prefix.lower().startswith("plan:"):
-            search_path = prefix + "*" if prefix else "*"
-            try:
-                file_matches = globlib.glob(search_path)
-                for f in sorted(file_matches)[:6]:
-                    is_dir = os.path.isdir(f)
-                    matches.append(("dir" if is_dir else "file", f, ""))
-            except Exception:
-                pass
+        # Get file matches (only if not explicitly looking for agents or plans),
+        # listing no more than the slots left - a bare "@" fills most with agents
+        file_slots = min(6, 8 - len(matches))
+        if file_slots > 0 and not agent_mode and not prefix_l.startswith("plan:"):
+            for f, is_dir in _resolve_at_matches(prefix)[:file_slots]:
+                matches.append(("dir" if is_dir else "file", f, ""))
 
         # Store as list of tuples (type, name, description)
         self._file_matches = matches[:8]
-        if self.app.is_running:
-            self.app.invalidate()
+        self._invalidate()
 
     def _update_history_matches(self, prefix: str):
         """Update matches for /load history command"""
@@ -781,18 +1205,17 @@ class ChatLayout:
             if not prefix or filename.lower().startswith(prefix.lower()):
                 matches.append(("history", filename, date_desc))
         self._file_matches = matches[:8]
-        if self.app.is_running:
-            self.app.invalidate()
+        self._invalidate()
 
     def _clear_file_matches(self):
         """Clear file match state"""
         if self._file_matches:
             self._file_matches = []
             self._file_match_prefix = ""
-            if self.app.is_running:
-                self.app.invalidate()
+            self._invalidate()
 
     def _accept_input(self, buff: Buffer):
+        _clear_at_cache()
         if self._is_busy:
             queued_text = self._pasted_content if self._pasted_content is not None else buff.text
             self.queue_message(queued_text)
@@ -819,30 +1242,10 @@ class ChatLayout:
                 parts = [("class:helper", "  📁 ")]
             else:
                 parts = [("class:helper", "  @ ")]
-            for i, match in enumerate(self._file_matches):
-                match_type, name, desc = match
-                if match_type == "agent":
-                    display = name.replace("agent:", "")
-                    style = "#e06c75"  # Red/pink for agents
-                elif match_type == "plan":
-                    display = name.replace("plan:", "")
-                    if desc:
-                        display = f"{display} ({desc})"
-                    style = "#98c379"  # Green for plans
-                elif match_type == "dir":
-                    display = os.path.basename(name) + "/"
-                    style = "#5f9ea0"  # Cyan for directories
-                elif match_type == "history":
-                    display = name
-                    if desc:
-                        display = f"{name} ({desc})"
-                    style = "#c678dd"  # Purple for history files
-                else:
-                    display = os.path.basename(name)
-                    style = "#808080"  # Gray for files
+            for i, (match_type, name, desc) in enumerate(self._file_matches):
                 if i > 0:
                     parts.append(("class:helper", "  "))
-                parts.append((style, display))
+                parts.append((_MATCH_STYLE[match_type], _MATCH_DISPLAY[match_type](name, desc)))
             return parts
 
         if not self._helper_text:
@@ -865,13 +1268,11 @@ class ChatLayout:
 
     def set_helper(self, text: str):
         self._helper_text = text
-        if self.app.is_running:
-            self.app.invalidate()
+        self._invalidate()
 
     def clear_helper(self):
         self._helper_text = ""
-        if self.app.is_running:
-            self.app.invalidate()
+        self._invalidate()
 
     def _get_status_line(self):
         """Get the status line content (fixed above input)"""
@@ -884,9 +1285,7 @@ class ChatLayout:
         parts.append(("class:status", self.status_text))
 
         if self.status_start > 0:
-            import time
-
-            elapsed = time.time() - self.status_start
+            elapsed = _time.monotonic() - self.status_start
             if elapsed < 60:
                 time_str = f"{elapsed:.1f}s"
             else:
@@ -915,10 +1314,7 @@ class ChatLayout:
         return parts
 
     def _get_spinner(self) -> str:
-        if "Thinking" in self.status_text or "thinking" in self.status_text:
-            frames = self.SPINNER_THINKING
-        else:
-            frames = self.SPINNER_FRAMES
+        frames = self._spinner_frames
         return frames[self._spinner_idx % len(frames)]
 
     def _get_toolbar(self):
@@ -953,11 +1349,9 @@ class ChatLayout:
         """Get cursor position - always at end since we slice content for scrolling"""
         from prompt_toolkit.data_structures import Point
 
-        formatted = self._get_output_text()
-        if not formatted:
-            return Point(x=0, y=0)
-        line_count = sum(1 for style, text in formatted if text == "\n")
-        return Point(x=0, y=line_count)
+        # The control fetches its text before the cursor, so the count
+        # stored by _get_output_text matches what is being displayed
+        return Point(x=0, y=self._output_cursor_y)
 
     def _get_tool_style(self, tool_text: str) -> str:
         """Get the style for a tool based on its name"""
@@ -981,15 +1375,14 @@ class ChatLayout:
 
     def _parse_markdown_line(self, text: str, base_style: str = "") -> list:
         """Parse inline markdown and return formatted text tuples"""
-        import re
+        # Every inline marker needs a '*' or a backtick
+        if "*" not in text and "`" not in text:
+            return [(base_style, text)]
 
         result = []
         pos = 0
 
-        # Pattern for inline formatting: ***bold italic***, **bold**, *italic*, `code`
-        pattern = re.compile(r"(\*\*\*(.+?)\*\*\*|\*\*(.+?)\*\*|\*(.+?)\*|`([^`]+)`)")
-
-        for match in pattern.finditer(text):
+        for match in _INLINE_MD_RE.finditer(text):
             # Add text before match
             if match.start() > pos:
                 result.append((base_style, text[pos : match.start()]))
@@ -1011,51 +1404,13 @@ class ChatLayout:
 
         return result if result else [(base_style, text)]
 
-    def _highlight_code(self, code: str, lang: str) -> list:
-        """Syntax highlight code and return formatted tuples"""
+    def _highlight_code(self, code_lines: list[str], lang: str) -> tuple:
+        """Syntax highlight code lines and return formatted tuples for each line"""
+        code = "\n".join(code_lines)
         if not PYGMENTS_AVAILABLE:
-            return [("#98c379", code)]
+            return _split_token_lines([("#98c379", code)])
 
-        try:
-            if lang:
-                lexer = get_lexer_by_name(lang, stripall=True)
-            else:
-                lexer = guess_lexer(code)
-        except ClassNotFound:
-            lexer = TextLexer()
-
-        # Get tokens from pygments and convert to prompt_toolkit format
-        result = []
-        from pygments.token import Token
-
-        # Token to color mapping (One Dark theme inspired)
-        token_colors = {
-            Token.Keyword: "#c678dd",  # Purple
-            Token.Keyword.Namespace: "#c678dd",
-            Token.Keyword.Type: "#e5c07b",
-            Token.Name.Function: "#61afef",  # Blue
-            Token.Name.Class: "#e5c07b",  # Yellow
-            Token.Name.Builtin: "#56b6c2",  # Cyan
-            Token.Name.Decorator: "#e5c07b",
-            Token.String: "#98c379",  # Green
-            Token.Number: "#d19a66",  # Orange
-            Token.Operator: "#56b6c2",
-            Token.Comment: "#5c6370 italic",  # Gray italic
-            Token.Punctuation: "#abb2bf",
-            Token.Name: "#e06c75",  # Red for names
-            Token.Name.Variable: "#e06c75",
-        }
-
-        for token_type, value in lexer.get_tokens(code):
-            # Find matching color (check parent types too)
-            color = "#abb2bf"  # Default
-            for t in token_type.split():
-                if t in token_colors:
-                    color = token_colors[t]
-                    break
-            result.append((color, value))
-
-        return result
+        return _highlight_lines(code, lang)
 
     def _render_table(self, rows: list, prefix: str = "") -> list:
         """Render a markdown table with box drawing characters"""
@@ -1073,29 +1428,25 @@ class ChatLayout:
         if not parsed_rows:
             return []
 
-        # Calculate column widths from ALL rows
-        num_cols = max(len(r) for r in parsed_rows)
-        col_widths = [0] * num_cols
-        for row in parsed_rows:
-            for i, cell in enumerate(row):
-                if i < num_cols:
-                    col_widths[i] = max(col_widths[i], len(cell) + 2)
-
-        # Ensure minimum width
-        col_widths = [max(w, 5) for w in col_widths]
-
-        # Top border: ┌───┬───┐
-        result.append(("#5c6370", f"{prefix}\u250c"))
-        for i, width in enumerate(col_widths):
-            result.append(("#5c6370", "\u2500" * width))
-            if i < len(col_widths) - 1:
-                result.append(("#5c6370", "\u252c"))
-        result.append(("#5c6370", "\u2510"))
-        result.append(("", "\n"))
+        # Calculate column widths from ALL rows (with a minimum width of 5)
+        col_widths = [
+            max(max(map(len, col)) + 2, 5) for col in zip_longest(*parsed_rows, fillvalue="")
+        ]
+        num_cols = len(col_widths)
+
+        # Border rows are built as one string each: ┌───┬───┐ ├───┼───┤ └───┴───┘
+        dashes = ["\u2500" * width for width in col_widths]
+        top = f"{prefix}\u250c" + "\u252c".join(dashes) + "\u2510"
+        middle = f"{prefix}\u251c" + "\u253c".join(dashes) + "\u2524"
+        bottom = f"{prefix}\u2514" + "\u2534".join(dashes) + "\u2518"
 
+        result.append(("#5c6370", top))
+        result.append(_NL)
+
+        row_start = ("#5c6370", f"{prefix}\u2502")
         for row_idx, cells in enumerate(parsed_rows):
             # Data row: │ cell │ cell │
-            result.append(("#5c6370", f"{prefix}\u2502"))
+            result.append(row_start)
             for i in range(num_cols):
                 cell = cells[i] if i < len(cells) else ""
                 width = col_widths[i]
@@ -1110,26 +1461,15 @@ class ChatLayout:
                 if i < num_cols - 1:
                     result.append(("#5c6370", "\u2502"))
             result.append(("#5c6370", "\u2502"))
-            result.append(("", "\n"))
+            result.append(_NL)
 
-            # After header row, add separator: ├───┼───┤
+            # After header row, add separator
             if row_idx == 0 and len(parsed_rows) > 1:
-                result.append(("#5c6370", f"{prefix}\u251c"))
-                for i, width in enumerate(col_widths):
-                    result.append(("#5c6370", "\u2500" * width))
-                    if i < len(col_widths) - 1:
-                        result.append(("#5c6370", "\u253c"))
-                result.append(("#5c6370", "\u2524"))
-                result.append(("", "\n"))
-
-        # Bottom border: └───┴───┘
-        result.append(("#5c6370", f"{prefix}\u2514"))
-        for i, width in enumerate(col_widths):
-            result.append(("#5c6370", "\u2500" * width))
-            if i < len(col_widths) - 1:
-                result.append(("#5c6370", "\u2534"))
-        result.append(("#5c6370", "\u2518"))
-        result.append(("", "\n"))
+                result.append(("#5c6370", middle))
+                result.append(_NL)
+
+        result.append(("#5c6370", bottom))
+        result.append(_NL)
 
         return result
 
@@ -1140,19 +1480,14 @@ class ChatLayout:
         # Check for headers (with optional leading asterisks stripped)
         clean = content.lstrip()
 
-        # Headers - check from most specific to least
-        if clean.startswith("#### "):
-            text = clean[5:].strip().replace("*", "")
-            result.append(("#56b6c2", f"{indent}{text}"))  # Cyan for h4
-        elif clean.startswith("### "):
-            text = clean[4:].strip().replace("*", "")
-            result.append(("bold #61afef", f"{indent}{text}"))
-        elif clean.startswith("## "):
-            text = clean[3:].strip().replace("*", "")
-            result.append(("bold", f"{indent}\u2500 {text} \u2500"))
-        elif clean.startswith("# "):
-            text = clean[2:].strip().replace("*", "")
-            result.append(("bold", f"{indent}\u2550 {text.upper()} \u2550"))
+        # Headers - the number of leading '#' picks the level
+        level = len(clean) - len(clean.lstrip("#"))
+        if 1 <= level <= 4 and clean[level : level + 1] == " ":
+            style, fmt = _HEADER_FORMATS[level]
+            text = clean[level + 1 :].strip().replace("*", "")
+            if level == 1:
+                text = text.upper()
+            result.append((style, fmt.format(indent=indent, text=text)))
         # Lists
         elif clean.startswith("- "):
             result.append(("", f"{indent}\u2022 "))
@@ -1163,7 +1498,7 @@ class ChatLayout:
             result.extend(self._parse_markdown_line(clean[2:]))
         # Numbered lists
         elif clean and clean[0].isdigit():
-            m = re.match(r"^(\d+)\.\s+(.*)$", clean)
+            m = _NUMBERED_ITEM_RE.match(clean)
             if m:
                 result.append(("#5c6370", f"{indent}{m.group(1)}. "))
                 result.extend(self._parse_markdown_line(m.group(2)))
@@ -1175,11 +1510,46 @@ class ChatLayout:
         return result
 
     def _get_output_text(self):
-        """Get formatted output text"""
-        lines = self._output_lines.copy()
+        """Get formatted output text, reusing the last render while output is unchanged"""
+        self._sync_terminal_size()
+        # Live agent/task lines animate at 2 frames/s, so the status spinner's
+        # 10Hz invalidations only re-render them when their frame changes
+        tick = int(_time.time() * 2) if self._output_volatile else 0
+        key = (
+            self._output_version,
+            self._tool_calls_collapsed,
+            self._auto_scroll,
+            self._scroll_position,
+            self._term_h,
+            tick,
+        )
+        if key == self._output_cache_key:
+            return self._output_cache
+        self._output_volatile = False
+        self._output_cache = self._render_output()
+        self._output_cursor_y = self._output_cache.count(_NL)
+        if self._output_volatile:
+            key = key[:-1] + (int(_time.time() * 2),)
+        self._output_cache_key = key
+        return self._output_cache
+
+    def _reset_format_cache(self):
+        """Drop cached formatting after earlier output lines change"""
+        self._fmt_cache = []
+        self._fmt_upto = 0
+        self._fmt_line_starts = [0]
+        self._output_version += 1
+
+    def _render_output(self):
+        """Format and slice _output_lines for the output window"""
+        # Resume after the formatted prefix cached at the last checkpoint
+        start = self._fmt_upto
+        lines = self._output_lines[start:]
 
         # Format lines with colors
-        result = []
+        result = self._fmt_cache.copy()
+        resume_len = len(result)
+        checkpoint = (start, len(result))
         in_code_block = False
         code_lang = ""
         code_buffer = []
@@ -1189,67 +1559,65 @@ class ChatLayout:
 
         # Agent block tracking
         in_agent_block = False
-        agent_name = ""
         agent_tool_count = 0
 
-        for line in lines:
+        for idx, line in enumerate(lines, start):
+            # Lines formatted so far can be reused while no block is open and
+            # nothing live (agent status, plan tasks) has been rendered
+            if not (in_code_block or table_rows or in_agent_block or self._output_volatile):
+                checkpoint = (idx, len(result))
+
+            # Strip once; the first non-blank char gates the prefix checks below
+            ls = line.lstrip()
+            fc = ls[:1]
+
+            # Plain prose (unindented, no special first char) skips straight to
+            # inline markdown unless a code block or table is being collected
+            if fc and fc == line[:1] and fc not in _BLOCK_LEAD_CHARS:
+                if not (in_code_block or table_rows):
+                    result.extend(self._parse_markdown_line(line))
+                    result.append(_NL)
+                    continue
+
+            # Identify the line's @@MARKER@@ (if any) with one match
+            m = _MARKER_RE.match(line) if fc == "@" else None
+            marker = (m.group(1) or m.group(2)) if m else ""
+
             # Handle agent block markers
-            if line.startswith("@@AGENT_START@@ "):
+            if marker == "AGENT_START":
                 in_agent_block = True
-                # Parse: name|task|color
-                parts = line[16:].split("|")
-                agent_name = parts[0] if parts else "agent"
-                agent_task = parts[1] if len(parts) > 1 else ""
-                agent_color = parts[2] if len(parts) > 2 else "#5f9ea0"
                 agent_tool_count = 0
-
                 # Show agent header: [⏺ name] task description
-                result.append(("", "\n"))
-                result.append((f"bg:{agent_color} #1e1e1e bold", f" \u23fa {agent_name} "))
-                if agent_task:
-                    display_task = agent_task[:50] + "..." if len(agent_task) > 50 else agent_task
-                    result.append(("#abb2bf", f" {display_task}"))
-                result.append(("", "\n"))
+                result.extend(_agent_header(line[16:]))
                 continue
 
-            elif line.startswith("@@AGENT_LIVE@@ "):
-                # Parse: status|tool_count
-                parts = line[15:].split("|")
-                status_text = parts[0].strip() if parts and parts[0].strip() else "Thinking..."
-                live_tool_count = int(parts[1]) if len(parts) > 1 and parts[1].isdigit() else 0
+            elif marker == "AGENT_LIVE":
+                # Lines of finished agents have no status left and render nothing
+                live = self._live_status.get(line[15:])
+                if live is None:
+                    continue
+                self._output_volatile = True
+                status_text, live_tool_count = live
+                status_text = status_text.strip() or "Thinking..."
 
                 # Always show current status with spinner
-                spinner_frames = ["◐", "◓", "◑", "◒"]
-                import time as _t
-                spinner = spinner_frames[int(_t.time() * 2) % 4]
-                result.append(("#61afef", f"  {spinner} "))
+                result.append(_AGENT_SPINNER[int(_time.time() * 2) % 4])
                 result.append(("#abb2bf", status_text))
                 if live_tool_count > 1:
                     result.append(("#5c6370", f"  ({live_tool_count} tools)"))
-                result.append(("", "\n"))
+                result.append(_NL)
 
-                # Show live task list below the status (if any)
+                # Show live task list below the status (if any); rebuilt only
+                # when the TaskStore changes, not on every spinner frame
                 try:
-                    from ..tools.tasks import TaskStore, TaskStatus
-                    store = TaskStore.get_instance()
-                    tasks = store.list_all()
-                    if tasks:
-                        for task in tasks[:10]:  # Limit to 10 tasks
-                            if task.status == TaskStatus.COMPLETED:
-                                result.append(("#98c379", "    ✓ "))
-                                result.append(("#5c6370 strike", f"{task.subject[:50]}"))
-                            elif task.status == TaskStatus.IN_PROGRESS:
-                                result.append(("#e5c07b", "    ◐ "))
-                                result.append(("#abb2bf", f"{task.subject[:50]}"))
-                            else:
-                                result.append(("#5c6370", "    ○ "))
-                                result.append(("#abb2bf", f"{task.subject[:50]}"))
-                            result.append(("", "\n"))
+                    from ..tools.tasks import TaskStore
+
+                    result.extend(_live_task_lines(TaskStore._version))
                 except Exception:
                     pass
                 continue
 
-            elif line.startswith("@@AGENT_END@@ "):
+            elif marker == "AGENT_END":
                 # Parse: name|tool_uses|tokens|elapsed
                 parts = line[14:].split("|")
                 end_agent_name = parts[0] if parts else ""
@@ -1282,29 +1650,26 @@ class ChatLayout:
 
                 stats_str = " · ".join(stats_parts) if stats_parts else "Done"
                 result.append(("#5c6370", f"  \u23bf  Done ({stats_str})"))
-                result.append(("", "\n"))
+                result.append(_NL)
 
                 # Show expand/collapse hint if there are tool calls
                 if tool_uses > 0 and self._tool_calls_collapsed:
                     result.append(("#5c6370", f"     (ctrl+o to expand {tool_uses} tool calls)"))
-                    result.append(("", "\n"))
+                    result.append(_NL)
 
-                result.append(("", "\n"))
+                result.append(_NL)
                 in_agent_block = False
-                agent_name = ""
                 agent_tool_count = 0
                 continue
 
             # Skip tool calls if collapsed and in agent block
             if in_agent_block and self._tool_calls_collapsed:
                 if (
-                    line.startswith("@@TOOL@@ ")
-                    or line.strip().startswith("@@RESULT@@ ")
-                    or line.strip().startswith("@@DIFF_")
-                    or line.startswith("    - ")
-                    or line.startswith("    + ")
+                    marker in ("TOOL", "RESULT", "DIFF_REMOVE", "DIFF_ADD")
+                    or (fc == "-" and line.startswith("    - "))
+                    or (fc == "+" and line.startswith("    + "))
                 ):
-                    if line.startswith("@@TOOL@@ "):
+                    if marker == "TOOL":
                         agent_tool_count += 1
                     continue
             # Detect prefix (⏺ for assistant first line, or indentation)
@@ -1319,7 +1684,7 @@ class ChatLayout:
                 content = line[2:]
 
             # Handle code blocks (check content, not full line)
-            content_stripped = content.strip() if content else ""
+            content_stripped = content.strip() if prefix == "\u23fa " else ls.rstrip()
 
             if content_stripped.startswith("```"):
                 if not in_code_block:
@@ -1329,34 +1694,19 @@ class ChatLayout:
                     code_buffer = []
                     result.append(("#5c6370", f"{prefix}\u250c\u2500\u2500 {code_lang or 'code'} "))
                     result.append(("#5c6370", "\u2500" * 20))
-                    result.append(("", "\n"))
+                    result.append(_NL)
                 else:
                     # Ending code block - now highlight the buffered code
                     in_code_block = False
                     if code_buffer:
-                        full_code = "\n".join(code_buffer)
-                        highlighted = self._highlight_code(full_code, code_lang)
-                        # Split highlighted code back into lines
-                        current_line = [("#5c6370", f"{prefix}\u2502 ")]
-                        for style, text in highlighted:
-                            if "\n" in text:
-                                parts = text.split("\n")
-                                for i, part in enumerate(parts):
-                                    if i > 0:
-                                        # Finish previous line, start new one
-                                        result.extend(current_line)
-                                        result.append(("", "\n"))
-                                        current_line = [("#5c6370", f"{prefix}\u2502 ")]
-                                    if part:
-                                        current_line.append((style, part))
-                            else:
-                                current_line.append((style, text))
-                        if current_line != [("#5c6370", f"{prefix}\u2502 ")]:
-                            result.extend(current_line)
-                            result.append(("", "\n"))
+                        gutter = ("#5c6370", f"{prefix}\u2502 ")
+                        for line_tokens in self._highlight_code(code_buffer, code_lang):
+                            result.append(gutter)
+                            result.extend(line_tokens)
+                            result.append(_NL)
                     result.append(("#5c6370", f"{prefix}\u2514"))
                     result.append(("#5c6370", "\u2500" * 24))
-                    result.append(("", "\n"))
+                    result.append(_NL)
                     code_buffer = []
                 continue
 
@@ -1365,17 +1715,11 @@ class ChatLayout:
                 continue
 
             # Handle tables - collect all rows, render when table ends
-            is_table_row = content_stripped.startswith("|") and content_stripped.endswith("|")
+            is_table_row = content_stripped[:1] == "|" and content_stripped.endswith("|")
             is_separator = (
                 is_table_row
                 and "---" in content_stripped
-                and not any(
-                    c.isalpha()
-                    for c in content_stripped.replace("|", "")
-                    .replace("-", "")
-                    .replace(":", "")
-                    .strip()
-                )
+                and _TABLE_SEP_RE.fullmatch(content_stripped) is not None
             )
 
             # If we have buffered rows and this isn't a table row, render the table
@@ -1393,23 +1737,24 @@ class ChatLayout:
                 continue
 
             # Tool markers (these are raw, not prefixed)
-            if line.startswith("@@TOOL@@ "):
+            if marker == "TOOL":
                 tool_text = line[9:]
                 style = self._get_tool_style(tool_text)
                 result.append((style, f"\u23fa {tool_text}"))
-                result.append(("", "\n"))
-            elif line.strip().startswith("@@RESULT@@ "):
+                result.append(_NL)
+            elif marker == "RESULT":
                 result.append(("#5c6370", f"  \u23bf {line.strip()[11:]}"))
-                result.append(("", "\n"))
-            elif line.strip().startswith("@@DIFF_REMOVE@@ "):
+                result.append(_NL)
+            elif marker == "DIFF_REMOVE":
                 result.append(("#e06c75", f"  \u2796 {line.strip()[16:]}"))
-                result.append(("", "\n"))
-            elif line.strip().startswith("@@DIFF_ADD@@ "):
+                result.append(_NL)
+            elif marker == "DIFF_ADD":
                 result.append(("#98c379", f"  \u2795 {line.strip()[13:]}"))
-                result.append(("", "\n"))
-            elif line.startswith("@@PLAN_TASK@@ "):
+                result.append(_NL)
+            elif marker == "PLAN_TASK":
                 # Format: @@PLAN_TASK@@ id|status|subject
                 # Look up current status from TaskStore for live updates
+                self._output_volatile = True
                 parts = line[14:].split("|", 2)
                 task_id = parts[0] if parts else "?"
                 task_status = parts[1] if len(parts) > 1 else "pending"
@@ -1436,65 +1781,69 @@ class ChatLayout:
                     # Pending checkbox
                     result.append(("#5c6370", "  ☐ "))
                     result.append(("#abb2bf", task_subject))
-                result.append(("", "\n"))
-            elif line.startswith("    - "):
+                result.append(_NL)
+            elif fc == "-" and line.startswith("    - "):
                 result.append(("#e06c75", f"    \u2212 {line[6:]}"))
-                result.append(("", "\n"))
-            elif line.startswith("    + "):
+                result.append(_NL)
+            elif fc == "+" and line.startswith("    + "):
                 result.append(("#98c379", f"    + {line[6:]}"))
-                result.append(("", "\n"))
+                result.append(_NL)
             # User message (> for first line, >  for continuations)
-            elif line.startswith("> "):
+            elif fc == ">" and line.startswith("> "):
                 if line.startswith(">  "):
                     # Continuation line
                     result.append(("#61afef", f"  {line[3:]}"))
                 else:
                     # First line
                     result.append(("#61afef", f"\u276f {line[2:]}"))
-                result.append(("", "\n"))
+                result.append(_NL)
             # Thinking indicator
-            elif line.startswith("\u2733 "):
+            elif fc == "\u2733" and line.startswith("\u2733 "):
                 result.append(("#5c6370", line))
-                result.append(("", "\n"))
+                result.append(_NL)
             # Empty line
-            elif not line.strip():
+            elif not fc:
                 result.append(("", line))
-                result.append(("", "\n"))
+                result.append(_NL)
             # Assistant message with prefix - format the content
             elif prefix:
                 result.append(("#abb2bf", prefix))
                 result.extend(self._format_content_line(content))
-                result.append(("", "\n"))
+                result.append(_NL)
             # Headers at line start (not indented)
-            elif line.startswith("### ") or line.startswith("## ") or line.startswith("# "):
+            elif fc == "#" and line.startswith(("### ", "## ", "# ")):
                 result.extend(self._format_content_line(line))
-                result.append(("", "\n"))
+                result.append(_NL)
             # Regular text with inline markdown
             else:
                 result.extend(self._parse_markdown_line(line))
-                result.append(("", "\n"))
+                result.append(_NL)
+
+        if not (in_code_block or table_rows or in_agent_block or self._output_volatile):
+            checkpoint = (len(self._output_lines), len(result))
 
         # Flush any remaining table
         if table_rows:
             result.extend(self._render_table(table_rows, ""))
 
+        # Extend the cached line offsets with the lines formatted this pass
+        line_starts = self._fmt_line_starts + [
+            i + 1 for i in range(resume_len, len(result)) if result[i] == _NL
+        ]
+        self._fmt_upto, fmt_len = checkpoint
+        self._fmt_cache = result[:fmt_len]
+        self._fmt_line_starts = line_starts[: bisect_right(line_starts, fmt_len)]
+
         # Remove trailing newline if present
-        if result and result[-1] == ("", "\n"):
+        if result and result[-1] == _NL:
             result.pop()
 
-        # Convert result to lines for slicing/display
-        lines = []
-        current_line = []
-        for item in result:
-            current_line.append(item)
-            if item == ("", "\n"):
-                lines.append(current_line)
-                current_line = []
-        if current_line:
-            lines.append(current_line)
-
-        total_lines = len(lines)
-        visible_height = self._get_terminal_height() - 6  # Account for UI elements
+        # An empty last line (after a trailing newline) is not counted
+        while line_starts and line_starts[-1] >= len(result):
+            line_starts.pop()
+        total_lines = len(line_starts)
+        self._output_line_count = total_lines
+        visible_height = self._term_h - 6  # Account for UI elements
 
         # If content fits in visible area, return as-is
         if total_lines <= visible_height:
@@ -1513,21 +1862,20 @@ class ChatLayout:
             start_line = max(0, min(start_line, total_lines - visible_height))
             end_line = min(total_lines, start_line + visible_height)
 
-        # Rebuild result from sliced lines
-        sliced_result = []
-        for line in lines[start_line:end_line]:
-            sliced_result.extend(line)
+        start_idx = line_starts[start_line]
+        end_idx = line_starts[end_line] if end_line < total_lines else len(result)
+        sliced_result = result[start_idx:end_idx]
 
         # Add scroll indicator at top if not at the very top
         if start_line > 0:
             sliced_result = [
                 ("#5c6370", f"\u2191 {start_line} more lines above \u2191"),
-                ("", "\n"),
+                _NL,
             ] + sliced_result
 
         # Add scroll indicator at bottom if not at the very bottom (only when manually scrolled)
         if not self._auto_scroll and end_line < total_lines:
-            sliced_result.append(("", "\n"))
+            sliced_result.append(_NL)
             sliced_result.append(
                 ("#5c6370", f"\u2193 {total_lines - end_line} more lines below \u2193")
             )
@@ -1536,19 +1884,42 @@ class ChatLayout:
 
     def append_output(self, text: str):
         self._output_lines.append(text)
-        if self.app.is_running:
-            self.app.invalidate()
+        self._output_version += 1
+        self._invalidate()
+
+    def append_output_many(self, lines: Iterable[str]):
+        """Append several output lines with a single redraw"""
+        self._output_lines.extend(lines)
+        self._output_version += 1
+        self._invalidate()
 
     def clear_output(self):
         self._output_lines = []
         self._auto_scroll = True
-        if self.app.is_running:
-            self.app.invalidate()
+        self._reset_format_cache()
+        self._invalidate()
+
+    def _trim_output(self):
+        """Drop the oldest turns once output grows past _MAX_OUTPUT_LINES"""
+        lines = self._output_lines
+        excess = len(lines) - _MAX_OUTPUT_LINES
+        if excess <= 0:
+            return
+        # Cut just before a user message, so no code or agent block is split
+        for cut in range(excess, len(lines)):
+            line = lines[cut]
+            if line.startswith("> ") and not line.startswith(">  "):
+                break
+        else:
+            return
+        del lines[:cut]
+        self._reset_format_cache()
 
     def add_user_message(self, text: str):
         # Scroll to bottom for new message
         self._auto_scroll = True
         self._scroll_position = 0
+        self._trim_output()
         self._output_lines.append("")
         lines = text.split("\n")
         # Use >  prefix for all user message lines (first line and continuations)
@@ -1558,8 +1929,8 @@ class ChatLayout:
             else:
                 self._output_lines.append(f">  {line}")  # >  for continuation
         self._output_lines.append("")
-        if self.app.is_running:
-            self.app.invalidate()
+        self._output_version += 1
+        self._invalidate()
 
     def add_assistant_message(self, text: str, elapsed: float = 0):
         # Scroll to bottom for new response
@@ -1586,8 +1957,8 @@ class ChatLayout:
             self._output_lines.append(f"\u2733 Thinking for {time_str}")
 
         self._output_lines.append("")
-        if self.app.is_running:
-            self.app.invalidate()
+        self._output_version += 1
+        self._invalidate()
 
     def set_agent(self, agent_name: str, task: str = "", color: str = "#5f9ea0"):
         """Set the current running agent"""
@@ -1595,40 +1966,41 @@ class ChatLayout:
         self._current_agent_task = task
         self._agent_color = color
         self._agent_tool_count = 0
-        self._agent_start_time = _time.time()
+        self._agent_start_time = _time.monotonic()
         self._agent_status = "Thinking..."
         # Format: @@AGENT_START@@ name|task|color
         self._output_lines.append(f"@@AGENT_START@@ {agent_name}|{task}|{color}")
-        # Add live status line that will be updated
-        self._agent_live_idx = len(self._output_lines)
-        self._output_lines.append(f"@@AGENT_LIVE@@ {self._agent_status}|0")
-        if self.app.is_running:
-            self.app.invalidate()
+        # Add live status line; its status is looked up by id when rendering
+        self._live_gen += 1
+        self._agent_live_id = str(self._live_gen)
+        self._live_status[self._agent_live_id] = (self._agent_status, 0)
+        self._output_lines.append(f"@@AGENT_LIVE@@ {self._agent_live_id}")
+        self._output_version += 1
+        self._invalidate()
 
     def update_agent_status(self, status: str, tool_count: int = 0):
         """Update the current agent's status text"""
-        if self._current_agent and self._agent_live_idx >= 0:
+        if self._current_agent and self._agent_live_id:
             self._agent_status = status
             # Update tool count if provided (from external agents)
             if tool_count > 0:
                 self._agent_tool_count = tool_count
-            # Update the live status line
-            self._output_lines[self._agent_live_idx] = (
-                f"@@AGENT_LIVE@@ {status}|{self._agent_tool_count}"
-            )
-            if self.app.is_running:
-                self.app.invalidate()
+            # Update the live status line; repeated identical updates don't redraw
+            live = (status, self._agent_tool_count)
+            if self._live_status.get(self._agent_live_id) == live:
+                return
+            self._live_status[self._agent_live_id] = live
+            self._output_version += 1
+            self._invalidate()
 
     def clear_agent(self, tool_uses: int = 0, tokens: int = 0):
         """Clear the current agent and show completion stats"""
         if self._current_agent:
-            elapsed = _time.time() - getattr(self, "_agent_start_time", _time.time())
+            elapsed = _time.monotonic() - self._agent_start_time
             tool_uses = tool_uses or self._agent_tool_count
-            # Remove the live status line
-            if self._agent_live_idx >= 0 and self._agent_live_idx < len(self._output_lines):
-                if self._output_lines[self._agent_live_idx].startswith("@@AGENT_LIVE@@"):
-                    self._output_lines.pop(self._agent_live_idx)
-            self._agent_live_idx = -1
+            # Retire the live status line
+            self._live_status.pop(self._agent_live_id, None)
+            self._agent_live_id = ""
             # Format: @@AGENT_END@@ name|tool_uses|tokens|elapsed
             self._output_lines.append(
                 f"@@AGENT_END@@ {self._current_agent}|{tool_uses}|{tokens}|{elapsed:.1f}"
@@ -1637,8 +2009,8 @@ class ChatLayout:
             self._current_agent_task = ""
             self._agent_tool_count = 0
             self._agent_status = ""
-            if self.app.is_running:
-                self.app.invalidate()
+            self._output_version += 1
+            self._invalidate()
 
     def add_tool_call(
         self,
@@ -1648,32 +2020,15 @@ class ChatLayout:
         lines_added: int = 0,
         lines_removed: int = 0,
     ):
-        if tool_name in ("read_file", "read"):
-            display_name = "Read"
-        elif tool_name in ("write_file", "write"):
-            display_name = "Write"
-        elif tool_name in ("edit_file", "edit"):
-            display_name = "Update"
-        elif tool_name in ("bash", "bash_output"):
-            display_name = "Bash"
-        elif tool_name == "glob":
-            display_name = "Glob"
-        elif tool_name == "grep":
-            display_name = "Grep"
-        elif tool_name == "task":
-            display_name = "Agent"
-        else:
-            display_name = tool_name.replace("_", " ").title()
+        display_name = _tool_display_name(tool_name)
 
         # Track tool calls under current agent and update live status
         if self._current_agent:
             self._agent_tool_count += 1
             # Update live status line with current tool
             status_text = f"{display_name}({label[:40]}{'...' if len(label) > 40 else ''})"
-            if self._agent_live_idx >= 0 and self._agent_live_idx < len(self._output_lines):
-                self._output_lines[self._agent_live_idx] = (
-                    f"@@AGENT_LIVE@@ {status_text}|{self._agent_tool_count}"
-                )
+            if self._agent_live_id:
+                self._live_status[self._agent_live_id] = (status_text, self._agent_tool_count)
 
         self._output_lines.append(f"@@TOOL@@ {display_name}({label})")
 
@@ -1689,40 +2044,38 @@ class ChatLayout:
             if first_line:
                 self._output_lines.append(f"  @@RESULT@@ {first_line}")
 
-        if self.app.is_running:
-            self.app.invalidate()
+        self._output_version += 1
+        self._invalidate()
 
     def add_file_diff(self, filepath: str, old_content: str, new_content: str):
         """Show a diff of file changes"""
-        short_path = filepath.split("/")[-1] if "/" in filepath else filepath
-
-        old_lines = old_content.split("\n") if old_content else []
-        new_lines = new_content.split("\n") if new_content else []
+        short_path = filepath.rpartition("/")[2]
 
         # Simple diff display - show removed then added
-        self._output_lines.append(f"@@TOOL@@ Update({short_path})")
+        out = [f"@@TOOL@@ Update({short_path})"]
 
-        # Show a few lines of context
+        # Show a few lines of context; only the previewed lines are split off
         max_preview = 5
 
-        if old_lines:
-            removed_count = len(old_lines)
-            self._output_lines.append(f"  @@DIFF_REMOVE@@ -{removed_count} lines")
-            for i, line in enumerate(old_lines[:max_preview]):
-                self._output_lines.append(f"    - {line[:60]}")
-            if len(old_lines) > max_preview:
-                self._output_lines.append(f"    ... +{len(old_lines) - max_preview} more")
-
-        if new_lines:
-            added_count = len(new_lines)
-            self._output_lines.append(f"  @@DIFF_ADD@@ +{added_count} lines")
-            for i, line in enumerate(new_lines[:max_preview]):
-                self._output_lines.append(f"    + {line[:60]}")
-            if len(new_lines) > max_preview:
-                self._output_lines.append(f"    ... +{len(new_lines) - max_preview} more")
+        if old_content:
+            removed_count = old_content.count("\n") + 1
+            out.append(f"  @@DIFF_REMOVE@@ -{removed_count} lines")
+            out.extend(
+                f"    - {line[:60]}" for line in old_content.split("\n", max_preview)[:max_preview]
+            )
+            if removed_count > max_preview:
+                out.append(f"    ... +{removed_count - max_preview} more")
+
+        if new_content:
+            added_count = new_content.count("\n") + 1
+            out.append(f"  @@DIFF_ADD@@ +{added_count} lines")
+            out.extend(
+                f"    + {line[:60]}" for line in new_content.split("\n", max_preview)[:max_preview]
+            )
+            if added_count > max_preview:
+                out.append(f"    ... +{added_count - max_preview} more")
 
-        if self.app.is_running:
-            self.app.invalidate()
+        self.append_output_many(out)
 
     def set_busy(self, busy: bool):
         self._is_busy = busy
@@ -1748,18 +2101,18 @@ class ChatLayout:
         if self.app.is_running:
             # Ensure input window is focused
             self.app.layout.focus(self.input_window)
-            self.app.invalidate()
+        self._invalidate()
 
     def queue_message(self, message: str):
         self._queued_messages.append(message)
-        if self.app.is_running:
-            self.app.invalidate()
+        self._ui_flags |= F_QUEUED
+        self._invalidate()
 
     def pop_queued_message(self) -> Optional[str]:
         if self._queued_messages:
-            msg = self._queued_messages.pop(0)
-            if self.app.is_running:
-                self.app.invalidate()
+            msg = self._queued_messages.popleft()
+            self._set_ui_flag(F_QUEUED, bool(self._queued_messages))
+            self._invalidate()
             return msg
         return None
 
@@ -1768,21 +2121,18 @@ class ChatLayout:
 
     def _has_queued(self) -> bool:
         """Check if there are queued messages (for conditional filter)"""
-        return bool(self._queued_messages)
+        return bool(self._ui_flags & F_QUEUED)
 
     async def _animate_spinner(self):
         try:
             while self.status_text:
                 await asyncio.sleep(0.1)
                 self._spinner_idx += 1
-                if self.app.is_running:
-                    self.app.invalidate()
+                self._invalidate()
         except asyncio.CancelledError:
             pass
 
     def set_status(self, text: str, input_tokens: int = 0, output_tokens: int = 0):
-        import time
-
         was_empty = not self.status_text
         self.status_text = text
 
@@ -1792,14 +2142,13 @@ class ChatLayout:
             self.output_tokens = output_tokens
 
         if was_empty and text:
-            self.status_start = time.time()
+            self.status_start = _time.monotonic()
             self._spinner_idx = 0
 
         if text and self._spinner_task is None and self.app.is_running:
             self._spinner_task = asyncio.create_task(self._animate_spinner())
 
-        if self.app.is_running:
-            self.app.invalidate()
+        self._invalidate()
 
     def clear_status(self):
         self.status_text = ""
@@ -1809,22 +2158,19 @@ class ChatLayout:
             self._spinner_task.cancel()
             self._spinner_task = None
 
-        if self.app.is_running:
-            self.app.invalidate()
+        self._invalidate()
 
     def set_file_changes(self, files: int, added: int = 0, removed: int = 0):
         self.files_changed = files
         self.lines_added = added
         self.lines_removed = removed
-        if self.app.is_running:
-            self.app.invalidate()
+        self._invalidate()
 
     def clear_changes(self):
         self.files_changed = 0
         self.lines_added = 0
         self.lines_removed = 0
-        if self.app.is_running:
-            self.app.invalidate()
+        self._invalidate()
 
     @property
     def current_mode(self) -> str:
@@ -1849,15 +2195,15 @@ class ChatLayout:
         await self.app.run_async()
 
     def show_error_overlay(self, error: str):
-        \"\"\"Show persistent error above input\"\"\"
+        """Show persistent error above input"""
         self.clear_status()
-        self._output_lines.append(\"\")
+        self._output_lines.append("")
 
-        self._output_lines.append(f\"@@ERROR_BLOCK@@ {error}\")
-        self._output_lines.append(\"Press any key to dismiss...\")
+        self._output_lines.append(f"@@ERROR_BLOCK@@ {error}")
+        self._output_lines.append("Press any key to dismiss...")
 
-        if self.app.is_running:
-            self.app.invalidate()
+        self._output_version += 1
+        self._invalidate()
 
     def exit(self):
         self.app.exit()
@@ -1884,8 +2230,7 @@ class ChatLayout:
             self.append_output(f"  ⚠️  DANGEROUS: {danger_reason}")
         self.append_output("  [y]es  [n]o  [a]lways (save to permissions)")
 
-        if self.app.is_running:
-            self.app.invalidate()
+        self._invalidate()
 
         # Wait for single key input
         self._approval_response = None
@@ -1936,7 +2281,6 @@ class ChatLayout:
         else:
             self.append_output("  ✗ Denied")
 
-        if self.app.is_running:
-            self.app.invalidate()
+        self._invalidate()
 
         return response
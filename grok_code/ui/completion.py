@@ -0,0 +1,141 @@
+"""Completion helpers shared by the chat layout and the prompt handler"""
+
+import os
+from bisect import bisect_left
+from functools import lru_cache
+
+# Resolved on first use; imported lazily to keep UI startup light
+_PLUGIN_REGISTRY = None
+
+
+def plugin_registry():
+    """Get the PluginRegistry singleton"""
+    global _PLUGIN_REGISTRY
+    if _PLUGIN_REGISTRY is None:
+        from ..plugins.registry import PluginRegistry
+
+        _PLUGIN_REGISTRY = PluginRegistry.get_instance()
+    return _PLUGIN_REGISTRY
+
+
+@lru_cache(maxsize=1)
+def _plugin_command_table(version: int) -> tuple[tuple[str, str, str, str], ...]:
+    """Build the plugin command table for a given registry version"""
+    table = []
+    for cmd in plugin_registry().list_commands():
+        desc = cmd.description[:35] + "..." if len(cmd.description) > 35 else cmd.description
+        table.append((cmd.name.lower(), cmd.name, f"/{cmd.name}", desc))
+    return tuple(table)
+
+
+def plugin_commands_lower() -> tuple[tuple[str, str, str, str], ...]:
+    """Get (lowercased name, name, "/name", description) for plugin commands"""
+    try:
+        return _plugin_command_table(plugin_registry()._version)
+    except Exception:
+        return ()
+
+
+def completion_table(entries: list) -> tuple[list, list[tuple[str, int]]]:
+    """Pair completion entries with a sorted (name, position) index for prefix lookups"""
+    return entries, sorted((entry[0], pos) for pos, entry in enumerate(entries))
+
+
+def prefix_matches(table: tuple[list, list[tuple[str, int]]], prefix: str) -> list:
+    """Entries whose name starts with prefix, in their original order"""
+    entries, index = table
+    lo = bisect_left(index, (prefix,))
+    hi = bisect_left(index, (prefix + "\uffff",), lo)
+    return [entries[pos] for pos in sorted(pos for _, pos in index[lo:hi])]
+
+
+@lru_cache(maxsize=1)
+def plugin_command_index(table: tuple) -> tuple[list, list[tuple[str, int]]]:
+    """Prefix index over a plugin command table, keyed on the lowercased names"""
+    return completion_table(list(table))
+
+
+def get_plugin_commands() -> dict[str, str]:
+    """Get commands from loaded plugins"""
+    return {cmd: desc for _, cmd, _, desc in plugin_commands_lower()}
+
+
+@lru_cache(maxsize=64)
+def _scan_dir(parent: str, mtime_ns: int) -> tuple[tuple[str, bool], ...]:
+    """Sorted (name, is_dir) entries of a directory, cached until its mtime changes"""
+    entries = []
+    with os.scandir(parent) as it:
+        for entry in it:
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            entries.append((entry.name, is_dir))
+    entries.sort()
+    return tuple(entries)
+
+
+# Large or generated directories that are never offered as @ matches
+_IGNORED_NAMES = frozenset(
+    {
+        ".git",
+        "node_modules",
+        "__pycache__",
+        ".venv",
+        "venv",
+        "dist",
+        "build",
+        ".mypy_cache",
+        ".pytest_cache",
+    }
+)
+
+
+@lru_cache(maxsize=4)
+def _gitignore_names(path: str, mtime_ns: int) -> tuple[frozenset, frozenset]:
+    """Ignored names for the top level and for subdirectories, given a .gitignore"""
+    anywhere, top_level = set(_IGNORED_NAMES), set()
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for line in f:
+            name = line.strip().rstrip("/")
+            # Only plain names are honoured; wildcards and negations are left to git
+            if not name or name[0] in "#!" or any(c in name for c in "*?[\\"):
+                continue
+            if name[0] == "/":
+                name = name[1:]
+                if name and "/" not in name:
+                    top_level.add(name)
+            elif "/" not in name:
+                anywhere.add(name)
+    return frozenset(anywhere | top_level), frozenset(anywhere)
+
+
+def _ignored_names(parent: str) -> frozenset:
+    """Names to leave out of @ matches listed from parent"""
+    try:
+        top_level, nested = _gitignore_names(".gitignore", os.stat(".gitignore").st_mtime_ns)
+    except OSError:
+        return _IGNORED_NAMES
+    return top_level if not parent or parent == "." else nested
+
+
+def match_paths(prefix: str, limit: int) -> list[tuple[str, bool]]:
+    """Paths starting with prefix as (path, is_dir), like sorted(glob(prefix + "*"))"""
+    parent, base = os.path.split(prefix)
+    try:
+        entries = _scan_dir(parent or ".", os.stat(parent or ".").st_mtime_ns)
+    except OSError:
+        return []
+    ignored = _ignored_names(parent)
+    # Hidden entries only match when asked for explicitly, as with glob
+    show_hidden = base.startswith(".")
+    matches = []
+    for name, is_dir in entries[bisect_left(entries, (base,)) :]:
+        if not name.startswith(base):
+            break
+        if (name.startswith(".") and not show_hidden) or name in ignored:
+            continue
+        matches.append((os.path.join(parent, name), is_dir))
+        if len(matches) >= limit:
+            break
+    return matches
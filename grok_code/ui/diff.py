@@ -7,6 +7,44 @@ from rich.syntax import Syntax
 
 from .console import console
 
+try:
+    from patiencediff import PatienceSequenceMatcher as _SequenceMatcher
+
+    PATIENCEDIFF_AVAILABLE = True
+except ImportError:
+    _SequenceMatcher = difflib.SequenceMatcher
+    PATIENCEDIFF_AVAILABLE = False
+
+# Syntax highlighting language by file extension
+_LANG_MAP = {
+    "py": "python",
+    "js": "javascript",
+    "ts": "typescript",
+    "tsx": "tsx",
+    "jsx": "jsx",
+    "json": "json",
+    "md": "markdown",
+    "yaml": "yaml",
+    "yml": "yaml",
+    "sh": "bash",
+    "bash": "bash",
+    "rs": "rust",
+    "go": "go",
+    "rb": "ruby",
+    "html": "html",
+    "css": "css",
+}
+
+
+def _hunk_range(start: int, stop: int) -> str:
+    """Format a unified diff hunk range (same as difflib)"""
+    length = stop - start
+    if length == 1:
+        return str(start + 1)
+    if not length:
+        return f"{start},0"
+    return f"{start + 1},{length}"
+
 
 def show_diff(
     old_content: str,
@@ -15,39 +53,33 @@ def show_diff(
     context_lines: int = 3,
 ):
     """Display a beautiful code diff"""
-    old_lines = old_content.splitlines(keepends=True)
-    new_lines = new_content.splitlines(keepends=True)
-
-    diff = list(
-        difflib.unified_diff(
-            old_lines,
-            new_lines,
-            fromfile=f"a/{filename}",
-            tofile=f"b/{filename}",
-            lineterm="",
-        )
-    )
+    old_lines = old_content.splitlines()
+    new_lines = new_content.splitlines()
+
+    matcher = _SequenceMatcher(None, old_lines, new_lines)
+    groups = list(matcher.get_grouped_opcodes(context_lines))
 
-    if not diff:
-        console.print(f"  [dim]No changes to {filename}[/dim]")
+    if not groups:
+        console.print(f"  [dim]No changes to {filename}[/dim]", highlight=False)
         return
 
-    # Build styled diff output
+    # Build styled diff output straight from the opcodes, one append per run
     output = Text()
-
-    for line in diff:
-        line = line.rstrip("\n")
-
-        if line.startswith("+++") or line.startswith("---"):
-            output.append(line + "\n", style="bold")
-        elif line.startswith("@@"):
-            output.append(line + "\n", style="cyan")
-        elif line.startswith("+"):
-            output.append(line + "\n", style="green")
-        elif line.startswith("-"):
-            output.append(line + "\n", style="red")
-        else:
-            output.append(line + "\n", style="dim")
+    output.append(f"--- a/{filename}\n+++ b/{filename}\n", style="bold")
+
+    for group in groups:
+        first, last = group[0], group[-1]
+        old_range = _hunk_range(first[1], last[2])
+        new_range = _hunk_range(first[3], last[4])
+        output.append(f"@@ -{old_range} +{new_range} @@\n", style="cyan")
+        for tag, i1, i2, j1, j2 in group:
+            if tag == "equal":
+                output.append("".join(f" {line}\n" for line in old_lines[i1:i2]), style="dim")
+                continue
+            if tag != "insert":
+                output.append("".join(f"-{line}\n" for line in old_lines[i1:i2]), style="red")
+            if tag != "delete":
+                output.append("".join(f"+{line}\n" for line in new_lines[j1:j2]), style="green")
 
     console.print(
         Panel(
@@ -66,22 +98,24 @@ def show_edit_preview(
 ):
     """Show a preview of an edit operation"""
     console.print()
-    console.print(f"  [bold]Edit:[/bold] {filename}")
+    console.print(f"  [bold]Edit:[/bold] {filename}", highlight=False)
     console.print()
 
     # Show what's being replaced
-    console.print("  [red]- Remove:[/red]")
-    for line in old_string.split("\n")[:5]:
-        console.print(f"    [red]{line}[/red]")
-    if old_string.count("\n") > 5:
-        console.print(f"    [dim]... +{old_string.count(chr(10)) - 5} lines[/dim]")
+    console.print("  [red]- Remove:[/red]", highlight=False)
+    for line in old_string.split("\n", 5)[:5]:
+        console.print(f"    [red]{line}[/red]", highlight=False)
+    newlines = old_string.count("\n")
+    if newlines > 5:
+        console.print(f"    [dim]... +{newlines - 5} lines[/dim]", highlight=False)
 
     console.print()
-    console.print("  [green]+ Add:[/green]")
-    for line in new_string.split("\n")[:5]:
-        console.print(f"    [green]{line}[/green]")
-    if new_string.count("\n") > 5:
-        console.print(f"    [dim]... +{new_string.count(chr(10)) - 5} lines[/dim]")
+    console.print("  [green]+ Add:[/green]", highlight=False)
+    for line in new_string.split("\n", 5)[:5]:
+        console.print(f"    [green]{line}[/green]", highlight=False)
+    newlines = new_string.count("\n")
+    if newlines > 5:
+        console.print(f"    [dim]... +{newlines - 5} lines[/dim]", highlight=False)
 
     console.print()
 
@@ -90,35 +124,17 @@ def show_file_write(filename: str, content: str, is_new: bool = False):
     """Show file write with syntax highlighting preview"""
     action = "Create" if is_new else "Write"
     console.print()
-    console.print(f"  [bold]{action}:[/bold] {filename}")
+    console.print(f"  [bold]{action}:[/bold] {filename}", highlight=False)
 
     # Detect language from extension
-    ext = filename.rsplit(".", 1)[-1] if "." in filename else ""
-    lang_map = {
-        "py": "python",
-        "js": "javascript",
-        "ts": "typescript",
-        "tsx": "tsx",
-        "jsx": "jsx",
-        "json": "json",
-        "md": "markdown",
-        "yaml": "yaml",
-        "yml": "yaml",
-        "sh": "bash",
-        "bash": "bash",
-        "rs": "rust",
-        "go": "go",
-        "rb": "ruby",
-        "html": "html",
-        "css": "css",
-    }
-    lang = lang_map.get(ext, "text")
-
-    # Show preview of content
-    lines = content.split("\n")
+    _, dot, ext = filename.rpartition(".")
+    lang = _LANG_MAP.get(ext.lower(), "text") if dot else "text"
+
+    # Show preview of content; only the first 10 lines are split off
+    lines = content.split("\n", 10)
     preview = "\n".join(lines[:10])
     if len(lines) > 10:
-        preview += f"\n... +{len(lines) - 10} more lines"
+        preview += f"\n... +{lines[10].count(chr(10)) + 1} more lines"
 
     syntax = Syntax(preview, lang, theme="monokai", line_numbers=True)
     console.print(Panel(syntax, border_style="green", padding=(0, 1)))
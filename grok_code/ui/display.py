@@ -2,6 +2,7 @@
 
 import os
 import time
+from contextlib import contextmanager
 from typing import Optional
 
 from rich.console import Console
@@ -16,37 +17,75 @@ from .diff import show_diff, show_edit_preview, show_file_write
 from .agents import show_agent_start, show_agent_tool, show_agent_complete
 
 
+def _format_task(d, a):
+    """Label a subagent task with its agent type and a short prompt"""
+    agent_type = a.get("agent_type", a.get("subagent_type", "agent"))
+    prompt = d._truncate(a.get("prompt", a.get("description", "")), 30)
+    return f"{agent_type}: {prompt}"
+
+
+# Map tool names to clean labels; each formatter takes the Display and tool args
+_TOOL_FORMATTERS = {
+    "read_file": lambda d, a: f"Read {d._short_path(a.get('file_path', ''))}",
+    "write_file": lambda d, a: f"Write {d._short_path(a.get('file_path', ''))}",
+    "edit_file": lambda d, a: f"Edit {d._short_path(a.get('file_path', ''))}",
+    "bash": lambda d, a: f"$ {d._truncate(a.get('command', ''), 50)}",
+    "glob": lambda d, a: f"Glob {a.get('pattern', '')}",
+    "grep": lambda d, a: f"Grep {d._truncate(a.get('pattern', ''), 30)}",
+    "web_search": lambda d, a: f"Search: {d._truncate(a.get('query', ''), 40)}",
+    "web_fetch": lambda d, a: f"Fetch: {d._truncate(a.get('url', ''), 40)}",
+    "task": _format_task,
+    "task_create": lambda d, a: f"Task: {d._truncate(a.get('subject', ''), 40)}",
+    "task_update": lambda d, a: f"Update task #{a.get('taskId', '')}",
+    "task_list": lambda d, a: "List tasks",
+}
+
+
 class StreamingText:
     """Accumulates streamed text and renders it smoothly"""
 
     def __init__(self):
         self.content = ""
         self.live: Optional[Live] = None
+        self._renderable = Text("")
+        self._rendered_len = 0
 
     def start(self):
         """Start live display for streaming"""
         self.content = ""
+        self._renderable = Text("")
+        self._rendered_len = 0
+        # Live's refresh thread pulls the renderable 30 times/s, so the markdown
+        # is re-parsed at that rate no matter how fast chunks arrive
         self.live = Live(
-            Text(""),
             console=console,
+            get_renderable=self._get_renderable,
+            auto_refresh=True,
             refresh_per_second=30,  # Smooth updates
             transient=False,
         )
         self.live.start()
 
     def update(self, chunk: str):
-        """Add chunk and update display"""
+        """Add chunk to the content shown on the next refresh"""
         self.content += chunk
-        if self.live:
+
+    def _get_renderable(self):
+        """Render the accumulated content, reusing it until more arrives"""
+        content = self.content
+        if len(content) != self._rendered_len:
+            self._rendered_len = len(content)
             # Render as markdown for nice formatting
             try:
-                self.live.update(Markdown(self.content))
+                self._renderable = Markdown(content)
             except Exception:
-                self.live.update(Text(self.content))
+                self._renderable = Text(content)
+        return self._renderable
 
     def stop(self):
         """Stop live display"""
         if self.live:
+            # Stopping refreshes once more, so the last chunks are shown
             self.live.stop()
             self.live = None
 
@@ -168,34 +207,20 @@ class Display:
 
     def _format_tool(self, name: str, args: dict) -> str:
         """Format tool name and args for display"""
-        # Map tool names to clean labels
-        formatters = {
-            "read_file": lambda a: f"Read {self._short_path(a.get('file_path', ''))}",
-            "write_file": lambda a: f"Write {self._short_path(a.get('file_path', ''))}",
-            "edit_file": lambda a: f"Edit {self._short_path(a.get('file_path', ''))}",
-            "bash": lambda a: f"$ {self._truncate(a.get('command', ''), 50)}",
-            "glob": lambda a: f"Glob {a.get('pattern', '')}",
-            "grep": lambda a: f"Grep {self._truncate(a.get('pattern', ''), 30)}",
-            "web_search": lambda a: f"Search: {self._truncate(a.get('query', ''), 40)}",
-            "web_fetch": lambda a: f"Fetch: {self._truncate(a.get('url', ''), 40)}",
-            "task": lambda a: f"{a.get('agent_type', a.get('subagent_type', 'agent'))}: {self._truncate(a.get('prompt', a.get('description', '')), 30)}",
-            "task_create": lambda a: f"Task: {self._truncate(a.get('subject', ''), 40)}",
-            "task_update": lambda a: f"Update task #{a.get('taskId', '')}",
-            "task_list": lambda a: "List tasks",
-        }
-
-        formatter = formatters.get(name)
+        formatter = _TOOL_FORMATTERS.get(name)
         if formatter:
-            return formatter(args)
+            return formatter(self, args)
         return name
 
     def _short_path(self, path: str) -> str:
         """Shorten path for display"""
         if not path:
             return ""
-        parts = path.split("/")
-        if len(parts) > 2:
-            return f".../{'/'.join(parts[-2:])}"
+        head, sep, tail = path.rpartition("/")
+        if sep:
+            _, sep, parent = head.rpartition("/")
+            if sep:
+                return f".../{parent}/{tail}"
         return path
 
     def _truncate(self, text: str, max_len: int) -> str:
@@ -225,19 +250,19 @@ class Display:
 
     def error(self, msg: str):
         """Display error"""
-        console.print(f"[red]Error:[/red] {msg}")
+        console.print(f"[red]Error:[/red] {msg}", highlight=False)
 
     def warning(self, msg: str):
         """Display warning"""
-        console.print(f"[yellow]Warning:[/yellow] {msg}")
+        console.print(f"[yellow]Warning:[/yellow] {msg}", highlight=False)
 
     def success(self, msg: str):
         """Display success"""
-        console.print(f"[green]✓[/green] {msg}")
+        console.print(f"[green]✓[/green] {msg}", highlight=False)
 
     def info(self, msg: str):
         """Display info"""
-        console.print(f"[dim]{msg}[/dim]")
+        console.print(f"[dim]{msg}[/dim]", highlight=False)
 
     def code(self, code: str, language: str = "python"):
         """Display syntax-highlighted code"""
@@ -248,9 +273,17 @@ class Display:
         """Print a subtle divider"""
         console.print("[dim]─" * 40 + "[/dim]")
 
+    @contextmanager
+    def batch(self):
+        """Buffer console output and write it once when the outermost batch exits"""
+        # Rich's console buffer is reentrant; only the outermost exit flushes
+        with console:
+            yield self
+
     def show_edit(self, filename: str, old_string: str, new_string: str):
         """Show edit preview with diff"""
-        show_edit_preview(filename, old_string, new_string)
+        with self.batch():
+            show_edit_preview(filename, old_string, new_string)
 
     def show_file_diff(self, old_content: str, new_content: str, filename: str):
         """Show full file diff"""
@@ -258,7 +291,8 @@ class Display:
 
     def show_write(self, filename: str, content: str, is_new: bool = False):
         """Show file write with preview"""
-        show_file_write(filename, content, is_new)
+        with self.batch():
+            show_file_write(filename, content, is_new)
 
     def agent_start(self, agent_id: str, agent_type: str, description: str):
         """Show agent starting"""
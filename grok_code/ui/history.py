@@ -0,0 +1,66 @@
+"""Prompt history stored off the event loop"""
+
+import asyncio
+from datetime import datetime
+from typing import Optional
+
+from prompt_toolkit.history import FileHistory
+
+# How long history entries are collected before being written together
+_HISTORY_FLUSH_DELAY = 0.05
+
+
+class BufferedFileHistory(FileHistory):
+    """FileHistory that batches writes and appends them off the event loop"""
+
+    def __init__(self, filename: str):
+        super().__init__(filename)
+        self._pending: list[str] = []
+        self._flush_task: Optional[asyncio.Task] = None
+
+    def store_string(self, string: str) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._write([self._format_entry(string)])
+            return
+        self._pending.append(self._format_entry(string))
+        if self._flush_task is None:
+            self._flush_task = loop.create_task(self._flush_later())
+
+    @staticmethod
+    def _format_entry(string: str) -> str:
+        """Format an entry the way FileHistory writes it"""
+        lines = "".join(f"+{line}\n" for line in string.split("\n"))
+        return f"\n# {datetime.now()}\n{lines}"
+
+    def _write(self, entries: list[str]):
+        with open(self.filename, "ab") as f:
+            f.write("".join(entries).encode("utf-8"))
+
+    def _take_pending(self) -> list[str]:
+        batch, self._pending = self._pending, []
+        self._flush_task = None
+        return batch
+
+    def _write_or_keep(self, batch: list[str]):
+        """Write batch now, keeping it for the next flush if the write fails"""
+        try:
+            self._write(batch)
+        except OSError:
+            self._pending[:0] = batch
+
+    async def _flush_later(self):
+        """Write everything stored during the flush delay in one append"""
+        try:
+            await asyncio.sleep(_HISTORY_FLUSH_DELAY)
+        except asyncio.CancelledError:
+            # Loop shutting down - write now rather than lose the entries
+            self._write_or_keep(self._take_pending())
+            raise
+        batch = self._take_pending()
+        try:
+            await asyncio.to_thread(self._write, batch)
+        except (OSError, RuntimeError):
+            # Failed write or no executor left - retry on this thread
+            self._write_or_keep(batch)
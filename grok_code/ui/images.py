@@ -1,10 +1,29 @@
 """Image handling for grokCode"""
 
+import asyncio
 import base64
 import os
 import subprocess
 from pathlib import Path
 
+try:
+    import pybase64 as _b64
+
+    PYBASE64_AVAILABLE = True
+except ImportError:
+    _b64 = base64
+    PYBASE64_AVAILABLE = False
+
+# Image media types by file suffix
+_MEDIA_TYPES = {
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".gif": "image/gif",
+    ".webp": "image/webp",
+}
+_IMAGE_SUFFIXES = tuple(_MEDIA_TYPES)
+
 
 def get_clipboard_image() -> tuple[str, str] | None:
     """
@@ -22,7 +41,15 @@ def get_clipboard_image() -> tuple[str, str] | None:
         if "«class PNGf»" not in result.stdout and "TIFF" not in result.stdout:
             return None
 
-        # Save clipboard image to temp file
+        # pngpaste writes the clipboard PNG to stdout, skipping the temp file
+        try:
+            png = subprocess.run(["pngpaste", "-"], capture_output=True)
+            if png.returncode == 0 and png.stdout:
+                return _b64.b64encode(png.stdout).decode("utf-8"), "image/png"
+        except FileNotFoundError:
+            pass
+
+        # Otherwise save clipboard image to temp file
         temp_path = "/tmp/grok_clipboard_image.png"
         subprocess.run(
             [
@@ -44,7 +71,7 @@ def get_clipboard_image() -> tuple[str, str] | None:
 
         if os.path.exists(temp_path):
             with open(temp_path, "rb") as f:
-                data = base64.b64encode(f.read()).decode("utf-8")
+                data = _b64.b64encode(f.read()).decode("utf-8")
             os.remove(temp_path)
             return data, "image/png"
 
@@ -65,35 +92,34 @@ def load_image_file(path: str) -> tuple[str, str] | None:
         return None
 
     # Determine media type
-    suffix = path.suffix.lower()
-    media_types = {
-        ".png": "image/png",
-        ".jpg": "image/jpeg",
-        ".jpeg": "image/jpeg",
-        ".gif": "image/gif",
-        ".webp": "image/webp",
-    }
-
-    media_type = media_types.get(suffix)
+    media_type = _MEDIA_TYPES.get(path.suffix.lower())
     if not media_type:
         return None
 
     try:
         with open(path, "rb") as f:
-            data = base64.b64encode(f.read()).decode("utf-8")
+            data = _b64.b64encode(f.read()).decode("utf-8")
         return data, media_type
     except Exception:
         return None
 
 
+async def get_clipboard_image_async() -> tuple[str, str] | None:
+    """Get image from clipboard without blocking the event loop"""
+    return await asyncio.to_thread(get_clipboard_image)
+
+
+async def load_image_file_async(path: str) -> tuple[str, str] | None:
+    """Load and encode an image file without blocking the event loop"""
+    return await asyncio.to_thread(load_image_file, path)
+
+
 def is_image_path(text: str) -> bool:
     """Check if text looks like an image path"""
     text = text.strip()
-    if not text:
+    # Check the suffix first so most text never reaches the filesystem
+    if not text.lower().endswith(_IMAGE_SUFFIXES):
         return False
 
     path = Path(text).expanduser()
-    if path.exists() and path.suffix.lower() in (".png", ".jpg", ".jpeg", ".gif", ".webp"):
-        return True
-
-    return False
+    return path.suffix.lower() in _MEDIA_TYPES and path.exists()
@@ -1,15 +1,25 @@
 """Input handling with bottom toolbar"""
 
+import asyncio
 import os
-import glob as globlib
+import re
+from functools import lru_cache
+from typing import Optional
 from prompt_toolkit import PromptSession
-from prompt_toolkit.history import FileHistory
 from prompt_toolkit.key_binding import KeyBindings
 from prompt_toolkit.completion import Completer, Completion
 from prompt_toolkit.styles import Style
 from prompt_toolkit.formatted_text import HTML
 from pathlib import Path
 
+from .completion import (
+    completion_table,
+    match_paths,
+    plugin_commands_lower,
+    prefix_matches,
+)
+from .history import BufferedFileHistory
+
 
 
 class InterruptedInput:
@@ -26,6 +36,19 @@ MODE_LABELS = {
     "manual": "approve edits",
 }
 
+# Toolbar mode indicator and hint per mode, built once
+_MODE_TOOLBAR = {
+    mode: [
+        (style, f"  {icon} {MODE_LABELS[mode]}"),
+        ("class:bottom-toolbar.text", " (shift+Tab to cycle)"),
+    ]
+    for mode, icon, style in (
+        ("auto", "⏵⏵", "class:mode"),
+        ("plan", "◇", "class:mode"),
+        ("manual", "○", ""),
+    )
+}
+
 # Commands
 COMMANDS = {
     "help": "Show help",
@@ -43,19 +66,28 @@ COMMANDS = {
 }
 
 
-def get_plugin_commands() -> dict[str, str]:
-    """Get commands from loaded plugins"""
-    try:
-        from ..plugins.registry import PluginRegistry
+# (name, "/name", display, description) - display markup is parsed once
+_COMMAND_COMPLETIONS = completion_table(
+    [
+        (cmd, f"/{cmd}", HTML(f'<style fg="cyan">/{cmd}</style>'), desc)
+        for cmd, desc in COMMANDS.items()
+    ]
+)
+
+
+@lru_cache(maxsize=1)
+def _plugin_completions(table: tuple) -> tuple[list, list[tuple[str, int]]]:
+    """Completion entries for a plugin command table, like _COMMAND_COMPLETIONS"""
+    return completion_table(
+        [
+            (cmd, slash_cmd, HTML(f'<style fg="yellow">{slash_cmd}</style>'), desc)
+            for _, cmd, slash_cmd, desc in table
+        ]
+    )
+
 
-        registry = PluginRegistry.get_instance()
-        cmds = {}
-        for cmd in registry.list_commands():
-            desc = cmd.description[:35] + "..." if len(cmd.description) > 35 else cmd.description
-            cmds[cmd.name] = desc
-        return cmds
-    except Exception:
-        return {}
+# A lone /command, or an @ mention starting a word at the cursor
+_TRIGGER_RE = re.compile(r"^/(\S*)$|(?:^|\s)@(\S*)$")
 
 
 class GrokCompleter(Completer):
@@ -63,43 +95,33 @@ class GrokCompleter(Completer):
 
     def get_completions(self, document, complete_event):
         text = document.text_before_cursor
-
-        if text.startswith("/"):
-            prefix = text[1:].lower()
-            for cmd, desc in COMMANDS.items():
-                if not prefix or cmd.startswith(prefix):
-                    yield Completion(
-                        "/" + cmd,
-                        start_position=-len(text),
-                        display=HTML(f'<style fg="cyan">/{cmd}</style>'),
-                        display_meta=desc,
-                    )
-            for cmd, desc in get_plugin_commands().items():
-                if not prefix or cmd.startswith(prefix):
-                    yield Completion(
-                        "/" + cmd,
-                        start_position=-len(text),
-                        display=HTML(f'<style fg="yellow">/{cmd}</style>'),
-                        display_meta=desc,
-                    )
-
-        elif "@" in text:
-            at_idx = text.rfind("@")
-            path_prefix = text[at_idx + 1 :]
-            search_path = path_prefix + "*" if path_prefix else "*"
-            try:
-                matches = globlib.glob(search_path)
-                for match in sorted(matches)[:15]:
-                    basename = os.path.basename(match)
-                    if os.path.isdir(match):
-                        basename += "/"
+        # Nothing completes at the start of the buffer or between words
+        if not text or text[-1].isspace():
+            return
+        m = _TRIGGER_RE.search(text)
+        if not m:
+            return
+
+        slash_prefix, path_prefix = m.groups()
+        if slash_prefix is not None:
+            prefix = slash_prefix.lower()
+            start = -len(text)
+            for table in (_COMMAND_COMPLETIONS, _plugin_completions(plugin_commands_lower())):
+                for _, slash_cmd, display, desc in prefix_matches(table, prefix):
                     yield Completion(
-                        match,
-                        start_position=-len(path_prefix) if path_prefix else 0,
-                        display=basename,
+                        slash_cmd, start_position=start, display=display, display_meta=desc
                     )
-            except Exception:
-                pass
+            return
+
+        for match, is_dir in match_paths(path_prefix, 15):
+            basename = os.path.basename(match)
+            if is_dir:
+                basename += "/"
+            yield Completion(
+                match,
+                start_position=-len(path_prefix) if path_prefix else 0,
+                display=basename,
+            )
 
 
 # Dark theme style for grokCode
@@ -119,13 +141,15 @@ STYLE = Style.from_dict(
 
 
 class InputHandler:
+    _instance: Optional["InputHandler"] = None
+
     def __init__(self, history_file=None):
         if history_file is None:
             history_dir = Path.home() / ".grokcode"
             history_dir.mkdir(exist_ok=True)
             history_file = str(history_dir / "history")
 
-        self.history = FileHistory(history_file)
+        self.history = BufferedFileHistory(history_file)
         self.completer = GrokCompleter()
 
         # State
@@ -134,6 +158,7 @@ class InputHandler:
         self.lines_added = 0
         self.lines_removed = 0
         self.status_message = ""
+        self._prompt_cache: tuple[int, str] = (0, "")  # (width, prompt)
 
         bindings = KeyBindings()
 
@@ -174,22 +199,20 @@ class InputHandler:
             prompt_continuation=self._get_continuation,
         )
 
+    @classmethod
+    def get_instance(cls, history_file=None) -> "InputHandler":
+        """Get the shared handler, so its prompt session is only built once"""
+        if cls._instance is None:
+            cls._instance = cls(history_file)
+        return cls._instance
+
     def _get_toolbar(self):
         """Generate the bottom toolbar content"""
-        parts = []
-
         # Mode indicator
-        mode = MODES[self.mode_idx]
-        mode_label = MODE_LABELS[mode]
-
-        if mode == "auto":
-            parts.append(("class:mode", f"  ⏵⏵ {mode_label}"))
-        elif mode == "plan":
-            parts.append(("class:mode", f"  ◇ {mode_label}"))
-        else:
-            parts.append(("", f"  ○ {mode_label}"))
-
-        parts.append(("class:bottom-toolbar.text", " (shift+Tab to cycle)"))
+        prefix = _MODE_TOOLBAR[MODES[self.mode_idx]]
+        if self.files_changed <= 0 and not self.status_message:
+            return prefix
+        parts = list(prefix)
 
         # File changes if any
         if self.files_changed > 0:
@@ -218,9 +241,11 @@ class InputHandler:
 
     def _get_prompt(self):
         """Get the prompt with surrounding lines"""
-        width = os.get_terminal_size().columns
-        line = "─" * width
-        return f"\n\033[90m{line}\033[0m\n\033[36m❯\033[0m "
+        width = self._get_width()
+        if self._prompt_cache[0] != width:
+            line = "─" * width
+            self._prompt_cache = (width, f"\n\033[90m{line}\033[0m\n\033[36m❯\033[0m ")
+        return self._prompt_cache[1]
 
     def set_status(self, message: str):
         """Set status message in toolbar"""
@@ -252,12 +277,12 @@ class InputHandler:
             return 80
 
     def get_input(self, prompt=None):
+        """Prompt from synchronous code; use get_input_async inside an event loop"""
         try:
-            return self.session.prompt([("class:prompt", "❯ ")])
-        except EOFError:
-            return None
-        except KeyboardInterrupt:
-            return INTERRUPTED
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.get_input_async(prompt))
+        raise RuntimeError("get_input() blocks the event loop; await get_input_async() instead")
 
     async def get_input_async(self, prompt=None):
         try:
@@ -1,10 +1,10 @@
 """Status bar - real-time status above input"""
 
+import asyncio
 import time
 from typing import Optional
 from dataclasses import dataclass
 
-from rich.live import Live
 from rich.text import Text
 
 from .console import console
@@ -16,9 +16,14 @@ class SessionStats:
 
     input_tokens: int = 0
     output_tokens: int = 0
-    total_cost: float = 0.0
+    cost_micro: int = 0  # Estimated cost in millionths of a dollar, kept exact
     requests: int = 0
 
+    @property
+    def total_cost(self) -> float:
+        """Estimated cost in dollars"""
+        return self.cost_micro / 1_000_000
+
 
 class StatusBar:
     """Real-time status bar displayed above input"""
@@ -30,48 +35,61 @@ class StatusBar:
         "searching": ["◜", "◠", "◝", "◞", "◡", "◟"],
     }
 
+    STATUS_STYLES = {"thinking": "cyan", "working": "yellow", "searching": "green"}
+
+    REFRESH_PER_SECOND = 8
+
     def __init__(self):
         self.model: str = "grok-3"
         self.status: str = "idle"  # idle, thinking, working, searching
         self.current_action: str = ""
-        self.start_time: Optional[float] = None
+        self.start_ns: Optional[int] = None  # time.monotonic_ns() when work started
         self.stats = SessionStats()
-        self._live: Optional[Live] = None
+        self._live = None  # rich Live, imported when first shown
+        self._spin_task: Optional[asyncio.Task] = None
         self._spinner_idx = 0
-        self._last_update = 0
+        self._frames = self.SPINNERS["thinking"]
+        self._last_update = 0.0
+        self._elapsed_cache: tuple[int, str] = (-1, "")
+        # Model/token/cost segment, rebuilt only when those change
+        self._static_text: Optional[Text] = None
 
     def set_model(self, model: str):
         """Set current model"""
         self.model = model
+        self._static_text = None
 
     def start_thinking(self):
         """Start thinking state"""
         self.status = "thinking"
+        self._frames = self.SPINNERS["thinking"]
         self.current_action = "Thinking"
-        self.start_time = time.time()
+        self.start_ns = time.monotonic_ns()
         self._start_live()
 
     def start_working(self, action: str):
         """Start working on something"""
         self.status = "working"
+        self._frames = self.SPINNERS["working"]
         self.current_action = action
-        if not self.start_time:
-            self.start_time = time.time()
-        self._refresh()
+        if not self.start_ns:
+            self.start_ns = time.monotonic_ns()
+        self._refresh(force=True)
 
     def start_searching(self, query: str = ""):
         """Start searching"""
         self.status = "searching"
+        self._frames = self.SPINNERS["searching"]
         self.current_action = f"Searching{': ' + query[:20] if query else ''}"
-        if not self.start_time:
-            self.start_time = time.time()
-        self._refresh()
+        if not self.start_ns:
+            self.start_ns = time.monotonic_ns()
+        self._refresh(force=True)
 
     def set_idle(self):
         """Return to idle state"""
         self.status = "idle"
         self.current_action = ""
-        self.start_time = None
+        self.start_ns = None
         self._stop_live()
 
     def add_tokens(self, input_tokens: int = 0, output_tokens: int = 0):
@@ -80,27 +98,32 @@ class StatusBar:
         self.stats.output_tokens += output_tokens
         self.stats.requests += 1
         # Rough cost estimate (adjust for actual pricing)
-        self.stats.total_cost += (input_tokens * 0.000003) + (output_tokens * 0.000015)
+        self.stats.cost_micro += input_tokens * 3 + output_tokens * 15
+        self._static_text = None
         self._refresh()
 
     def _get_spinner(self) -> str:
         """Get current spinner frame"""
-        frames = self.SPINNERS.get(self.status, self.SPINNERS["thinking"])
+        frames = self._frames
         self._spinner_idx = (self._spinner_idx + 1) % len(frames)
         return frames[self._spinner_idx]
 
-    def _format_time(self, seconds: float) -> str:
-        """Format elapsed time"""
-        if seconds < 60:
-            return f"{seconds:.1f}s"
-        elif seconds < 3600:
-            mins = int(seconds // 60)
-            secs = int(seconds % 60)
+    def _format_tenths(self, tenths: int) -> str:
+        """Format elapsed time given in tenths of a second"""
+        if tenths < 600:
+            return f"{tenths // 10}.{tenths % 10}s"
+        seconds = tenths // 10
+        if seconds < 3600:
+            mins, secs = divmod(seconds, 60)
             return f"{mins}m {secs}s"
-        else:
-            hours = int(seconds // 3600)
-            mins = int((seconds % 3600) // 60)
-            return f"{hours}h {mins}m"
+        hours, secs = divmod(seconds, 3600)
+        return f"{hours}h {secs // 60}m"
+
+    def _elapsed_text(self, tenths: int) -> str:
+        """Format elapsed tenths of a second, reusing the last result"""
+        if tenths != self._elapsed_cache[0]:
+            self._elapsed_cache = (tenths, self._format_tenths(tenths))
+        return self._elapsed_cache[1]
 
     def _format_tokens(self, count: int) -> str:
         """Format token count"""
@@ -118,26 +141,30 @@ class StatusBar:
         # Left side: status
         if self.status != "idle":
             spinner = self._get_spinner()
-            elapsed = time.time() - self.start_time if self.start_time else 0
+            tenths = (time.monotonic_ns() - self.start_ns) // 100_000_000 if self.start_ns else 0
 
             # Spinner and action
-            if self.status == "thinking":
-                text.append(f" {spinner} ", style="cyan")
-                text.append(self.current_action, style="cyan")
-            elif self.status == "working":
-                text.append(f" {spinner} ", style="yellow")
-                text.append(self.current_action, style="yellow")
-            elif self.status == "searching":
-                text.append(f" {spinner} ", style="green")
-                text.append(self.current_action, style="green")
+            style = self.STATUS_STYLES.get(self.status)
+            if style:
+                text.append(f" {spinner} ", style=style)
+                text.append(self.current_action, style=style)
 
             # Elapsed time
-            text.append(f"  {self._format_time(elapsed)}", style="dim")
+            text.append(f"  {self._elapsed_text(tenths)}", style="dim")
 
         else:
             text.append(" ● ", style="green")
             text.append("Ready", style="dim")
 
+        if self._static_text is None:
+            self._static_text = self._render_static()
+        text.append_text(self._static_text)
+        return text
+
+    def _render_static(self) -> Text:
+        """Render the model, token and cost segment"""
+        text = Text()
+
         # Spacer
         text.append("  │  ", style="dim")
 
@@ -151,7 +178,7 @@ class StatusBar:
             text.append(" ↓", style="dim green")
             text.append(self._format_tokens(self.stats.output_tokens), style="dim")
 
-        if self.stats.total_cost > 0.001:
+        if self.stats.cost_micro > 1000:
             text.append(f"  ${self.stats.total_cost:.3f}", style="dim yellow")
 
         return text
@@ -159,24 +186,52 @@ class StatusBar:
     def _start_live(self):
         """Start live display"""
         if not self._live:
+            from rich.live import Live
+
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                loop = None
+
+            # Live re-renders on each refresh, so the spinner and any throttled
+            # updates still show up at REFRESH_PER_SECOND. Inside an event loop
+            # a task drives the refreshes instead of Live's own thread.
             self._live = Live(
-                self._render(),
                 console=console,
-                refresh_per_second=8,
+                get_renderable=self._render,
+                auto_refresh=loop is None,
+                refresh_per_second=self.REFRESH_PER_SECOND,
                 transient=True,
             )
             self._live.start()
+            if loop is not None:
+                self._spin_task = loop.create_task(self._spin())
+
+    async def _spin(self):
+        """Refresh the live display until it is stopped"""
+        interval = 1 / self.REFRESH_PER_SECOND
+        while self._live:
+            self._live.refresh()
+            await asyncio.sleep(interval)
 
     def _stop_live(self):
         """Stop live display"""
+        if self._spin_task:
+            self._spin_task.cancel()
+            self._spin_task = None
         if self._live:
             self._live.stop()
             self._live = None
 
-    def _refresh(self):
-        """Refresh the display"""
-        if self._live:
-            self._live.update(self._render())
+    def _refresh(self, force: bool = False):
+        """Refresh the display, at most REFRESH_PER_SECOND times unless forced"""
+        if not self._live:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_update < 1 / self.REFRESH_PER_SECOND:
+            return
+        self._last_update = now
+        self._live.refresh()
 
     def print_static(self):
         """Print static status (for when not live)"""
@@ -1,4 +1,5 @@
 import pytest
+from contextlib import asynccontextmanager
 from unittest.mock import AsyncMock, MagicMock, patch
 from grok_code.client import GrokClient, Message
 
@@ -44,23 +45,45 @@ async def test_chat():
         mock_post.assert_called_once()
 
 
+class StreamResponse:
+    """Stand-in for an httpx streaming response over fixed lines"""
+
+    def __init__(self, lines):
+        self.lines = lines
+
+    def raise_for_status(self):
+        pass
+
+    async def aiter_lines(self):
+        for line in self.lines:
+            yield line
+
+
+@pytest.fixture(scope="session")
+def stream_mock_factory():
+    """Build a replacement for AsyncClient.stream that serves the given lines"""
+
+    def make(lines):
+        @asynccontextmanager
+        async def stream(method, url, **kwargs):
+            yield StreamResponse(lines)
+
+        return stream
+
+    return make
+
+
 @pytest.mark.asyncio
-async def test_chat_stream():
+async def test_chat_stream(stream_mock_factory):
     """Test streaming chat"""
     chunks = [
         'data: {"choices":[{"delta":{"content":"Hel"}}]}',
         'data: {"choices":[{"delta":{"content":"lo"}}]}',
         "data: [DONE]",
     ]
-    mock_lines = AsyncMock()
-    mock_lines.__aiter__ = AsyncMock(side_effect=chunks)
-
-    mock_stream = MagicMock()
-    mock_stream.__aenter__.return_value.aiter_lines.return_value = mock_lines
 
     with patch("grok_code.client.httpx.AsyncClient") as MockClient:
-        mock_client = MockClient.return_value
-        mock_client.stream.return_value.__aenter__.return_value = mock_stream
+        MockClient.return_value.stream = stream_mock_factory(chunks)
 
         content_parts = []
 
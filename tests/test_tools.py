@@ -1,10 +1,18 @@
 import pytest
 from unittest.mock import patch, AsyncMock
-from grok_code.tools.file_ops import ReadTool, WriteTool, EditTool
+from grok_code.tools.file_ops import ReadTool, WriteTool, EditTool, clear_read_files
 from grok_code.tools.glob_grep import GlobTool, GrepTool
 from grok_code.tools.bash import BashTool
 
 
+@pytest.fixture(autouse=True)
+def _isolated_read_files():
+    """Start each test with no files marked as read"""
+    clear_read_files()
+    yield
+    clear_read_files()
+
+
 @pytest.mark.asyncio
 async def test_read_file(tmp_path):
     tool = ReadTool()
@@ -121,3 +129,68 @@ async def test_bash(mock_shell, tmp_path):
     tool = BashTool()
     result = await tool.execute(command="echo test")
     assert "stdout" in result
+
+
+def test_registry_schema_cache():
+    from grok_code.tools.registry import ToolRegistry
+
+    registry = ToolRegistry()
+    registry.register(ReadTool())
+    first = registry.get_schemas()
+    assert registry.get_schemas()[0] is first[0]
+    registry.register(GlobTool())
+    assert [s["function"]["name"] for s in registry.get_schemas()] == ["read_file", "glob"]
+
+
+def test_html_to_text():
+    from grok_code.tools.web import WebFetchTool
+
+    html = "<html><script>x()</script><h1>Title</h1><p>a &amp; b</p><ul><li>one<li>two</ul></html>"
+    assert WebFetchTool()._html_to_text(html) == "## Title\na & b\n- one\n- two"
+
+
+@pytest.mark.asyncio
+async def test_web_fetch_cache(monkeypatch):
+    import httpx
+    from grok_code.tools import web
+
+    calls = []
+
+    def handler(request):
+        calls.append(request.url)
+        return httpx.Response(200, headers={"content-type": "text/plain"}, content=b"hi")
+
+    monkeypatch.setattr(web, "_client", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    tool = web.WebFetchTool()
+    first = await tool.execute(url="example.com", prompt="a")
+    second = await tool.execute(url="example.com", prompt="b")
+    assert "hi" in first and second.endswith("User prompt: b")
+    assert len(calls) == 1
+
+
+def test_parse_summary_across_tail_boundary():
+    from grok_code.tools.test_ops import _SUMMARY_TAIL, parse_summary
+
+    summary = "=== 123 passed, 1 failed ==="
+    head = "collected 124 items\n"
+    # Pad after the summary so the tail boundary falls inside "123"
+    tail = "\n" + "w" * (_SUMMARY_TAIL + 5 - len(summary) - 1)
+    output = head + summary + tail
+    assert len(output) - _SUMMARY_TAIL == len(head) + 5
+    assert parse_summary(output) == "123 passed, 1 failed, 0 skipped"
+
+
+def test_detect_lang(tmp_path, monkeypatch):
+    from grok_code.tools import test_ops
+
+    monkeypatch.setattr(test_ops, "_LANG_CACHE", {})
+    assert test_ops.detect_lang("web/src/widget.test.ts") == "js"
+    assert test_ops.detect_lang("tests/test_ui.py") == "py"
+    assert test_ops.detect_lang("tests/") == "py"
+
+    # Relative path: tmp_path itself has "test" in its name
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "src").mkdir()
+    assert test_ops.detect_lang("src") == "unknown"
+    (tmp_path / "src" / "app.ts").write_text("")
+    assert test_ops.detect_lang("src") == "js"
@@ -0,0 +1,184 @@
+import asyncio
+import glob
+import os
+
+from grok_code.tools.tasks import TaskStore
+from grok_code.ui import chat_layout
+from grok_code.ui.chat_layout import (
+    ChatLayout,
+    _clear_at_cache,
+    _find_mention,
+    _live_task_lines,
+    _resolve_at_matches,
+    get_history_files,
+)
+from grok_code.ui.completion import match_paths
+from grok_code.ui.history import BufferedFileHistory
+
+
+def test_match_paths_matches_glob(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "foo.py").write_text("")
+    (tmp_path / "src" / "foobar").mkdir()
+    (tmp_path / "setup.py").write_text("")
+    (tmp_path / ".hidden").write_text("")
+
+    for prefix in ["", "s", "src/", "src/foo", ".h", "missing/"]:
+        expected = sorted(glob.glob(prefix + "*"))
+        assert [p for p, _ in match_paths(prefix, 100)] == expected
+
+    assert match_paths("src/foob", 10) == [(os.path.join("src", "foobar"), True)]
+
+
+def test_history_files_cached_by_mtime(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert get_history_files() == []
+
+    history_dir = tmp_path / ".grok" / "history"
+    history_dir.mkdir(parents=True)
+    (history_dir / "conversation_20250102_120000.md").write_text("")
+    (history_dir / "notes.md").write_text("")
+
+    files = get_history_files()
+    assert files == [("notes.md", ""), ("conversation_20250102_120000.md", "2025-01-02")]
+    assert get_history_files() is files
+
+
+def test_empty_mention_uses_cached_listing(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("HOME", str(tmp_path))
+    for i in range(20):
+        (tmp_path / f"file{i:02}.txt").write_text("")
+
+    def no_glob(*args, **kwargs):
+        raise AssertionError("glob should not be used for @ matches")
+
+    monkeypatch.setattr(glob, "glob", no_glob)
+    _clear_at_cache()
+    layout = ChatLayout(history_file=str(tmp_path / "history"))
+    layout._update_file_matches("")
+
+    agents = [m for m in layout._file_matches if m[0] == "agent"]
+    files = [m for m in layout._file_matches if m[0] == "file"]
+    assert [name for _, name, _ in agents] == ["agent:explore", "agent:plan", "agent:general"]
+    # Eight matches in total, without listing the rest of the directory
+    assert [name for _, name, _ in files] == [f"file{i:02}.txt" for i in range(5)]
+
+
+def test_at_matches_shared_until_cleared(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "a.txt").write_text("")
+    _clear_at_cache()
+
+    first = _resolve_at_matches("")
+    assert first == [("a.txt", False)]
+    (tmp_path / "b.txt").write_text("")
+    assert _resolve_at_matches("") is first
+
+    _clear_at_cache()
+    assert _resolve_at_matches("") == [("a.txt", False), ("b.txt", False)]
+
+
+def test_live_task_lines_follow_store_version():
+    store = TaskStore.get_instance()
+    store.clear()
+    task = store.create("Write docs", "")
+    pending = _live_task_lines(TaskStore._version)
+    assert ("#5c6370", "    ○ ") in pending
+
+    store.update(task.id, status="completed")
+    done = _live_task_lines(TaskStore._version)
+    assert ("#98c379", "    ✓ ") in done
+    assert ("#5c6370 strike", "Write docs") in done
+    store.clear()
+
+
+def test_output_trimmed_at_user_message(monkeypatch):
+    monkeypatch.setattr(chat_layout, "_MAX_OUTPUT_LINES", 10)
+    layout = ChatLayout()
+    for turn in range(3):
+        layout.add_user_message(f"question {turn}")
+        layout.add_assistant_message("answer\n```\ncode\n```")
+
+    layout.add_user_message("last")
+    lines = layout._output_lines
+    assert len(lines) <= 10 + 3
+    assert lines[0] == "> question 2"
+    assert lines[-2] == "> last"
+
+
+def test_match_paths_skips_ignored_names(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for name in ["node_modules", "notes", "out", "src", "src/out", "src/tmp", "tmp"]:
+        (tmp_path / name).mkdir()
+    (tmp_path / "nav.log").write_text("")
+    (tmp_path / ".gitignore").write_text("# build output\n/out\ntmp/\n*.log\n!keep\n")
+
+    assert match_paths("n", 10) == [("nav.log", False), ("notes", True)]
+    assert [p for p, _ in match_paths("", 10)] == ["nav.log", "notes", "src"]
+    assert match_paths("src/", 10) == [(os.path.join("src", "out"), True)]
+
+
+def test_buffered_history_batches_writes(tmp_path):
+    path = tmp_path / "history"
+    history = BufferedFileHistory(str(path))
+
+    async def store():
+        history.append_string("first")
+        history.append_string("two\nlines")
+        assert not path.exists()
+        await asyncio.sleep(0.2)
+
+    asyncio.run(store())
+    history.append_string("sync")
+
+    stored = list(BufferedFileHistory(str(path)).load_history_strings())
+    assert stored == ["sync", "two\nlines", "first"]
+
+
+def test_find_mention_in_last_word():
+    deep = "src/main/java/com/example/project/module/service/impl/VeryLongServiceName"
+    text = f"please look at @{deep}"
+    assert _find_mention(text) == text.index("@")
+    assert _find_mention("@" + deep) == 0
+    assert _find_mention("see @a.py and") == -1
+    assert _find_mention("line\n@b") == 5
+
+
+def test_buffered_history_keeps_entries_on_write_failure(tmp_path, monkeypatch):
+    path = tmp_path / "history"
+    history = BufferedFileHistory(str(path))
+    real_write = history._write
+    fail = [True]
+
+    def flaky_write(entries):
+        if fail[0]:
+            raise OSError("disk full")
+        real_write(entries)
+
+    monkeypatch.setattr(history, "_write", flaky_write)
+
+    async def store():
+        history.append_string("kept")
+        await asyncio.sleep(0.2)
+        assert not path.exists()
+        fail[0] = False
+        history.append_string("next")
+        await asyncio.sleep(0.2)
+
+    asyncio.run(store())
+    stored = list(BufferedFileHistory(str(path)).load_history_strings())
+    assert stored == ["next", "kept"]
+
+
+def test_terminal_size_follows_app_output(tmp_path, monkeypatch):
+    from prompt_toolkit.data_structures import Size
+
+    monkeypatch.setenv("HOME", str(tmp_path))
+    layout = ChatLayout(history_file=str(tmp_path / "history"))
+    monkeypatch.setattr(layout.app.output, "get_size", lambda: Size(rows=30, columns=50))
+
+    layout._get_output_text()
+    assert (layout._term_w, layout._term_h) == (50, 30)
+    assert layout._sep_cache[0][1] == "─" * 50